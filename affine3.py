@@ -1,7 +1,20 @@
 # Affine Cipher Hacker
 # http://inventwithpython.com/hacking (BSD Licensed)
 
-import affineCipher, detectEnglish, cryptomath, sys
+import affineCipher, detectEnglish, cryptomath, freqAnalysis, fitness3, prefilter3, sys, collections
+
+SYMBOLS = affineCipher.SYMBOLS
+# SYMBOL_LETTERS[i] is the A-Z index of SYMBOLS[i] (either case), or -1
+SYMBOL_LETTERS = [freqAnalysis.LETTERS.find(symbol.upper()) for symbol in SYMBOLS]
+# SYMBOL_IS_LETTER[i] is True if SYMBOLS[i] counts as a letter for isEnglish()
+SYMBOL_IS_LETTER = [symbol in detectEnglish.LETTERS_AND_SPACE for symbol in SYMBOLS]
+
+# most likely plaintext symbols, used by solveAffine() to guess the key
+PLAIN_GUESSES = ' etaoinsrhETAOINSRH'
+NUM_CIPHER_GUESSES = 6  # solveAffine() maps this many top ciphertext symbols
+
+KEY_TABLE = None  # list of (key, plainIndexes), built by getKeyTable()
+DECRYPT_TABLES = {}  # key -> str.translate() table, filled by getDecryptTable()
 
 def breakAffine(cipher):
     print('\nCipher:')
@@ -24,25 +37,159 @@ def Affine(cipher):
     else:
         print('Failed to hack encryption.')
 
-def hackAffine(message):
-    # Python programs can be stopped at any time by pressing Ctrl-C (on
-    # Windows) or Ctrl-D (on Mac and Linux)
-    # brute-force by looping through every possible key
-    for key in range(len(affineCipher.SYMBOLS) ** 2):
-        keyA = affineCipher.getKeyParts(key)[0]
-        if cryptomath.gcd(keyA, len(affineCipher.SYMBOLS)) != 1:
-            continue
+def getKeyTable():
+    # Returns the list of every valid key as (key, plainIndexes) tuples,
+    # where plainIndexes[i] is the index in SYMBOLS of the plaintext symbol
+    # that ciphertext symbol SYMBOLS[i] decrypts to. The table is built
+    # once, so checkKeys() and findModInverse() are not re-run per key.
+    global KEY_TABLE
+    if KEY_TABLE == None:
+        KEY_TABLE = []
+        for key in range(len(SYMBOLS) ** 2):
+            keyA, keyB = affineCipher.getKeyParts(key)
+            modInverseOfKeyA = cryptomath.findModInverse(keyA, len(SYMBOLS))
+            if modInverseOfKeyA == None:
+                continue
+            plainIndexes = bytes([(i - keyB) * modInverseOfKeyA % len(SYMBOLS) for i in range(len(SYMBOLS))])
+            KEY_TABLE.append((key, plainIndexes))
+    return KEY_TABLE
+
+def getDecryptTable(key, plainIndexes):
+    # Returns (and caches) the str.translate() table that decrypts with key.
+    if key not in DECRYPT_TABLES:
+        plainSymbols = ''.join([SYMBOLS[i] for i in plainIndexes])
+        DECRYPT_TABLES[key] = str.maketrans(SYMBOLS, plainSymbols)
+    return DECRYPT_TABLES[key]
+
+def scoreAffineKeys(message, letterPercentage=85):
+    # Scores every key from the symbol histogram of message, without
+    # decrypting it. Because the affine cipher only renames symbols, the
+    # plaintext histogram of a key is a relabelling of the ciphertext one.
+    # Keys whose plaintext cannot reach letterPercentage letters and spaces
+    # (so isEnglish() is bound to reject them) are dropped. Returns a list
+    # of (key, plainIndexes, score), best (lowest chi-squared) first.
+    if len(message) == 0:
+        return []
+
+    symbolCounts = []  # list of (index in SYMBOLS, count)
+    otherLetters = 0  # letters/spaces that are not in SYMBOLS, e.g. tabs
+    for symbol, count in collections.Counter(message).items():
+        symIndex = SYMBOLS.find(symbol)
+        if symIndex != -1:
+            symbolCounts.append((symIndex, count))
+        elif symbol in detectEnglish.LETTERS_AND_SPACE:
+            otherLetters += count
+    minLetters = letterPercentage * len(message) / 100.0
+
+    scored = []
+    for key, plainIndexes in getKeyTable():
+        numLetters = otherLetters
+        letterVector = [0] * 26
+        for symIndex, count in symbolCounts:
+            plainIndex = plainIndexes[symIndex]
+            if SYMBOL_IS_LETTER[plainIndex]:
+                numLetters += count
+                if SYMBOL_LETTERS[plainIndex] != -1:
+                    letterVector[SYMBOL_LETTERS[plainIndex]] += count
+        if numLetters < minLetters:
+            continue  # early rejection, not enough letters and spaces
+        scored.append((key, plainIndexes, freqAnalysis.chiSquared(letterVector)))
+
+    scored.sort(key=lambda item: item[2])
+    return scored
 
-        decryptedText = affineCipher.decryptMessage(key, message)
+def rankAffine(message, scoredKeys=None, prefilter=None, fitness=False):
+    # Returns every plausible key as a list of (key, score, plaintext)
+    # tuples, best first. Only keys that survive the histogram rejection in
+    # scoreAffineKeys() and the prefix stage of the prefilter are fully
+    # decrypted and checked with isEnglish(). Pass a prefilter3.Prefilter
+    # to read how many keys each stage eliminated. With fitness=True the
+    # survivors are ranked by quadgram fitness (see fitness3) instead of
+    # their chi-squared score.
+    if scoredKeys == None:
+        scoredKeys = scoreAffineKeys(message)
+    if prefilter == None:
+        prefilter = prefilter3.Prefilter()
 
+    keyScores = {}
+    tables = {}
+    for key, plainIndexes, score in scoredKeys:
+        keyScores[key] = score
+        tables[key] = plainIndexes
+    decryptPrefix = lambda key, length: message[:length].translate(getDecryptTable(key, tables[key]))
+    decrypt = lambda key: message.translate(getDecryptTable(key, tables[key]))
+
+    results = []
+    for key, decryptedText in prefilter.run(keyScores, decryptPrefix, decrypt, len(message)):
+        results.append((key, keyScores[key], decryptedText))
+    if fitness:
+        return fitness3.rank_by_fitness(results)
+    return results
+
+def solveAffine(message, plainGuesses=PLAIN_GUESSES, numCipherGuesses=NUM_CIPHER_GUESSES):
+    # Recovers the key algebraically instead of sweeping the key space.
+    # Two ciphertext symbols c1, c2 known to encrypt p1, p2 give
+    #   c1 - c2 = keyA * (p1 - p2)  (mod len(SYMBOLS))
+    #   keyB = c1 - keyA * p1       (mod len(SYMBOLS))
+    # The most frequent ciphertext symbols are paired with the most likely
+    # plaintext symbols, most probable hypotheses first, and each key is
+    # verified with isEnglish(). Falls back to the full sweep of
+    # rankAffine() only when no hypothesis verifies. Returns the list of
+    # (key, score, plaintext) tuples and the number of decryptions done.
+    counts = collections.Counter([symbol for symbol in message if symbol in SYMBOLS])
+    cipherIndexes = [SYMBOLS.find(symbol) for symbol, count in counts.most_common(numCipherGuesses)]
+    plainIndexes = [SYMBOLS.find(symbol) for symbol in plainGuesses]
+
+    # Each hypothesis maps two ciphertext symbols to two plaintext
+    # symbols. A lower sum of ranks means a more likely hypothesis.
+    hypotheses = []
+    for i in range(len(cipherIndexes)):
+        for j in range(i + 1, len(cipherIndexes)):
+            for pi in range(len(plainIndexes)):
+                for pj in range(len(plainIndexes)):
+                    if pi != pj:
+                        hypotheses.append((i + j + pi + pj, i, j, pi, pj))
+    hypotheses.sort()
+
+    tried = set()
+    decryptions = 0
+    for rank, i, j, pi, pj in hypotheses:
+        c1, c2 = cipherIndexes[i], cipherIndexes[j]
+        p1, p2 = plainIndexes[pi], plainIndexes[pj]
+        modInverse = cryptomath.findModInverse((p1 - p2) % len(SYMBOLS), len(SYMBOLS))
+        if modInverse == None:
+            continue  # this pair of guesses does not pin down key A
+        keyA = (c1 - c2) * modInverse % len(SYMBOLS)
+        if cryptomath.gcd(keyA, len(SYMBOLS)) != 1:
+            continue
+        keyB = (c1 - keyA * p1) % len(SYMBOLS)
+        key = keyA * len(SYMBOLS) + keyB
+        if key in tried:
+            continue
+        tried.add(key)
+
+        modInverseOfKeyA = cryptomath.findModInverse(keyA, len(SYMBOLS))
+        keyPlainIndexes = bytes([(c - keyB) * modInverseOfKeyA % len(SYMBOLS) for c in range(len(SYMBOLS))])
+        decryptedText = message.translate(getDecryptTable(key, keyPlainIndexes))
+        decryptions += 1
         if detectEnglish.isEnglish(decryptedText):
-            # Check with the user if the decrypted key has been found.
-            print('\nKey: %s' % (key))
-            response = 'D'
+            score = freqAnalysis.chiSquared(freqAnalysis.getLetterVector(decryptedText))
+            return [(key, score, decryptedText)], decryptions
+
+    prefilter = prefilter3.Prefilter()
+    results = rankAffine(message, prefilter=prefilter)
+    return results, decryptions + prefilter.candidates - prefilter.rejected_prefix
+
+def hackAffine(message):
+    # Python programs can be stopped at any time by pressing Ctrl-C (on
+    # Windows) or Ctrl-D (on Mac and Linux)
+    results, decryptions = solveAffine(message)
+    if results == []:
+        return None
 
-            if response.strip().upper().startswith('D'):
-                return decryptedText
-    return None
+    key, score, decryptedText = results[0]
+    print('\nKey: %s' % (key))
+    return decryptedText
 
 
 # If affineHacker.py is run (instead of imported as a module) call
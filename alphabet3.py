@@ -1,40 +1,62 @@
-def alphabet_to_number(word):
-	alphabet = 'abcdefghijklmnopqrstuvwxyz'
-	number = '1 2 3 4 5 6 7 8 9 10 11 12 13 14 15 16 17 18 19 20 21 22 23 24 25 26'
-	array_alphabet = list(alphabet)
-	array_number = number.split(' ')
-	converted_word = []
-	for letter in word:
-		for n in range(0, len(array_number), 1):
-			if letter == array_alphabet[n]:
-				converted_word.append(array_number[n])
-				converted_word.append(' ')
-	del converted_word[-1]
-	return ''.join(converted_word)
-
-def number_to_alphabet(numbers):
-	alphabet = 'abcdefghijklmnopqrstuvwxyz'
-	number = '1 2 3 4 5 6 7 8 9 10 11 12 13 14 15 16 17 18 19 20 21 22 23 24 25 26'
-	array_number = number.split(' ')
-	array_alphabet = list(alphabet)
-	numbers = numbers.split(' ')
-	converted_numbers = []
-	for num in numbers:
-		for n in range(0, len(array_alphabet), 1):
-			if int(num) > 26:
-				num = str(int(num) - 26)
-			else:
-				if num == array_number[n]:
-					converted_numbers.append(array_alphabet[n])
-					converted_numbers.append(' ')
-	del converted_numbers[-1]
-	return ''.join(converted_numbers)
+import detectEnglish
+
+ALPHABET = 'abcdefghijklmnopqrstuvwxyz'
+
+def alphabet_table(alphabet=ALPHABET, base=1):
+	# str.translate() table that replaces every symbol of alphabet by its
+	# position (counted from base) and a space, and deletes anything else.
+	return detectEnglish.FilterTable([(ord(symbol), '%d ' % (position + base)) for position, symbol in enumerate(alphabet)])
+
+def alphabet_to_number(word, alphabet=ALPHABET, base=1):
+	# 'math' -> '13 1 20 8', one table lookup per symbol. Symbols that are
+	# not in alphabet are skipped.
+	return word.translate(alphabet_table(alphabet, base))[:-1]
+
+def number_to_symbol(number, alphabet=ALPHABET, base=1):
+	# Numbers past the end of alphabet wrap around (27 is 'a' again), a
+	# token that is not a number is '?'.
+	try:
+		return alphabet[(int(number) - base) % len(alphabet)]
+	except ValueError:
+		return '?'
+
+def number_to_alphabet(numbers, alphabet=ALPHABET, base=1):
+	# '13 1 20 8' -> 'm a t h'
+	return ' '.join([number_to_symbol(number, alphabet, base) for number in numbers.split()])
+
+def alphabet_to_number_stream(chunks, alphabet=ALPHABET, base=1):
+	# Converts an iterable of text chunks, e.g. from stream3.read_chunks(),
+	# yielding the numbers piece by piece.
+	table = alphabet_table(alphabet, base)
+	separator = ''
+	for chunk in chunks:
+		converted = chunk.translate(table)[:-1]
+		if converted != '':
+			yield separator + converted
+			separator = ' '
+
+def number_to_alphabet_stream(chunks, alphabet=ALPHABET, base=1):
+	# Converts an iterable of chunks of whitespace separated numbers,
+	# yielding the symbols piece by piece. A number split between two
+	# chunks is carried over to the next one.
+	pending = ''
+	separator = ''
+	for chunk in chunks:
+		numbers = (pending + chunk).split()
+		pending = ''
+		if numbers != [] and not chunk[-1].isspace():
+			pending = numbers.pop()
+		if numbers != []:
+			yield separator + ' '.join([number_to_symbol(number, alphabet, base) for number in numbers])
+			separator = ' '
+	if pending != '':
+		yield separator + number_to_symbol(pending, alphabet, base)
 
 if __name__ == '__main__':
 	# define var
 	plaintext = 'math'
-	# test alphabet to number	
+	# test alphabet to number
 	print(alphabet_to_number(plaintext))
 	# test number to alphabet
 	plaintext_number = '13 1 20 8'
-	print(number_to_alphabet(plaintext_number))
\ No newline at end of file
+	print(number_to_alphabet(plaintext_number))
@@ -1,28 +1,141 @@
+import itertools, string
+
+import detectEnglish, fitness3, stream3
+
+# The 24-letter alphabet shares one code for i/j and one for u/v, the
+# 26-letter alphabet gives every letter its own code.
+ALPHABET_24 = 'abcdefghiklmnopqrstuwxyz'
+ALPHABET_26 = 'abcdefghijklmnopqrstuvwxyz'
+ALPHABETS = {24: ALPHABET_24, 26: ALPHABET_26}
+
+# spellings of a 24-letter decryption, as (name, str.translate() table)
+VARIANTS = {24: [('', {}), ('u>v', str.maketrans('u', 'v')), ('i>j', str.maketrans('i', 'j')), ('i>j u>v', str.maketrans('iu', 'jv'))], 26: [('', {})]}
+
+def makeGroupTable(alphabet, swap=False):
+	# Maps every 5-symbol group of A and B to its letter ('?' when the
+	# group is past the end of the alphabet). With swap=True the roles of
+	# A and B are exchanged.
+	table = {}
+	for value, symbols in enumerate(itertools.product('BA' if swap else 'AB', repeat=5)):
+		table[''.join(symbols)] = alphabet[value] if value < len(alphabet) else '?'
+	return table
+
+GROUP_TABLES = {}  # (alphabet size, swap) -> group table
+for size in ALPHABETS:
+	for swap in (False, True):
+		GROUP_TABLES[size, swap] = makeGroupTable(ALPHABETS[size], swap)
+
+# str.translate() tables that turn a cover text into its A/B symbols and
+# delete everything else, one per way of hiding the bits
+MODE_TABLES = {
+	'ab': detectEnglish.FilterTable({ord('A'): 'A', ord('a'): 'A', ord('B'): 'B', ord('b'): 'B'}),
+	'binary': detectEnglish.FilterTable({ord('0'): 'A', ord('1'): 'B'}),
+	'case': detectEnglish.FilterTable([(ord(letter), 'A') for letter in string.ascii_lowercase] + [(ord(letter), 'B') for letter in string.ascii_uppercase]),
+}
+
+SAMPLE_SIZE = 20000  # characters of a file used to choose how to decode it
+
+def baconModes(text):
+	# Returns the ways the bits may be hidden in text, as a list of
+	# (mode, translate table). A text of only A and B, or only 0 and 1, is
+	# a plain Bacon cipher. Otherwise the bits can be two distinct glyphs
+	# (the first one seen is A) or the case of the letters.
+	symbols = set(text) - set(string.whitespace)
+	if symbols == set():
+		return []
+	if symbols <= set('ABab'):
+		return [('ab', MODE_TABLES['ab'])]
+	if symbols <= set('01'):
+		return [('binary', MODE_TABLES['binary'])]
+	modes = []
+	if len(symbols) == 2:
+		glyphs = [symbol for symbol in dict.fromkeys(text) if symbol in symbols]
+		modes.append(('glyph', detectEnglish.FilterTable({ord(glyphs[0]): 'A', ord(glyphs[1]): 'B'})))
+	if symbols & set(string.ascii_lowercase) and symbols & set(string.ascii_uppercase):
+		modes.append(('case', MODE_TABLES['case']))
+	return modes
+
+def decodeGroups(bits, size=24):
+	# Decodes a string of A/B symbols under both assignments at once, one
+	# dict lookup per group and assignment. An incomplete last group is
+	# ignored. Returns (plaintext, swapped plaintext).
+	groups = [bits[i:i + 5] for i in range(0, len(bits) - 4, 5)]
+	return ''.join(map(GROUP_TABLES[size, False].__getitem__, groups)), ''.join(map(GROUP_TABLES[size, True].__getitem__, groups))
+
+def scoreBacon(plaintext):
+	# Quadgram fitness of plaintext (see fitness3), where every quadgram
+	# that touches an undecodable group ('?') counts as one never seen in
+	# English. Otherwise a decryption that is mostly '?' would be scored
+	# on its few short runs of letters only.
+	table = fitness3.get_table(4)
+	indexes = fitness3.ngram_indexes(plaintext, 4)
+	windows = max(len(plaintext) - 3, 1)
+	return (sum(map(table.__getitem__, indexes)) + fitness3.floors[4] * (windows - len(indexes))) / windows
+
+def rankBacon(cipher):
+	# Tries every mode of baconModes(), both assignments of A and B, both
+	# alphabets and the spellings of the 24-letter one. Returns a list of
+	# (settings, score, plaintext) tuples, best first, where score is
+	# scoreBacon() of the plaintext and settings is a (mode, translate
+	# table, alphabet size, swap, variant) tuple that decryptBaconStream()
+	# accepts.
+	candidates = []
+	for mode, table in baconModes(cipher):
+		bits = cipher.translate(table)
+		for size in ALPHABETS:
+			plaintexts = decodeGroups(bits, size)
+			for swap in (False, True):
+				for variant, variantTable in VARIANTS[size]:
+					plaintext = plaintexts[swap].translate(variantTable)
+					candidates.append(((mode, table, size, swap, variant), scoreBacon(plaintext), plaintext))
+	candidates.sort(key=lambda candidate: candidate[1], reverse=True)
+	return candidates
+
+def describeSettings(settings):
+	mode, table, size, swap, variant = settings
+	words = [mode, str(size)]
+	if swap:
+		words.append('swapped')
+	if variant != '':
+		words.append(variant)
+	return ' '.join(words)
+
 def decryptBacon(cipher):
-		bacon = ['AAAAA','AAAAB','AAABA','AAABB','AABAA','AABAB','AABBA','AABBB','ABAAA','ABAAB','ABABA','ABABB','ABBAA','ABBAB','ABBBA','ABBBB','BAAAA','BAAAB','BAABA','BAABB','BABAA','BABAB','BABBA','BABBB']
-		alphabet = ['a','b','c','d','e','f','g','h','i','k','l','m','n','o','p','q','r','s','t','u','w','x','y','z']
-		chunk_size = 5
-		myList = [ cipher[i:i+chunk_size] for i in range(0, len(cipher), chunk_size) ]
-		myArr = []
-		out = ''
-		for i in range(0, len(myList), 1):
-			myList[i] = myList[i].upper()
-			if any(myList[i] in s for s in bacon):
-				for j in range(0, len(bacon), 1):
-					if myList[i] == bacon[j]:
-						myArr.append(alphabet[j])
-			else:
-				myArr.append("?")
-		res = out.join(myArr)
-		iv = res.replace('u','v')
-		ju = res.replace('i','j')
-		jv = res.replace('i','j').replace('u','v')
-
-		print('[1]',res)
-		print('[2]',iv)
-		print('[3]',ju)
-		print('[4]',jv)
+	# display every decryption from the most to the least English-like,
+	# along with how it was decoded and its score
+	for settings, score, plaintext in rankBacon(cipher):
+		print('[%s] %.2f %s' % (describeSettings(settings), score, plaintext))
+
+def decryptBaconStream(chunks, settings):
+	# Decodes an iterable of text chunks with the settings of one result
+	# of rankBacon(), yielding the plaintext piece by piece. A group split
+	# between two chunks is carried over to the next one.
+	mode, table, size, swap, variant = settings
+	groupTable = GROUP_TABLES[size, swap]
+	variantTable = dict(VARIANTS[size])[variant]
+	pending = ''
+	for chunk in chunks:
+		bits = pending + chunk.translate(table)
+		end = len(bits) - len(bits) % 5
+		yield ''.join([groupTable[bits[i:i + 5]] for i in range(0, end, 5)]).translate(variantTable)
+		pending = bits[end:]
+
+def breakBaconStream(cipher, output=None):
+	# Decodes one large file. The settings are chosen on its first
+	# SAMPLE_SIZE characters, then the whole file is decoded chunk by chunk
+	# and written to the output path (or the screen) as it goes.
+	sample = ''.join(itertools.islice(stream3.read_chunks(cipher, SAMPLE_SIZE), 1))
+	results = rankBacon(sample)
+	if results == []:
+		print('Failed :(')
+		return None
+	settings = results[0][0]
+	print('[%s]\n' % (describeSettings(settings)))
+	stream3.write_chunks(decryptBaconStream(stream3.read_chunks(cipher), settings), output)
+	if output == None:
+		print()  # end the last line on the screen
+	return settings
 
 if __name__ == '__main__':
 	cipher = """BAAABABABAAABAAABBAABAABAAABAAABBAAAABBAABABBAAAAABAABBABAABAABAAABAAAABBABAABBAABAAAAAAAA"""
-	decryptBacon(cipher)
\ No newline at end of file
+	decryptBacon(cipher)
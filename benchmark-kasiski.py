@@ -0,0 +1,42 @@
+import random, sys, time
+
+import detectEnglish, vigenere3, vigenereCipher
+
+# Times vigenere3.kasiskiExamination() on ciphertexts of doubling length to
+# show how it scales. The n-gram index is built in one pass, so the ratio
+# between two rows stays between 2 (linear) and 4 (the old quadratic
+# search); it grows above 2 only because long texts repeat each n-gram
+# more often, and every pair of repeats is a spacing to count.
+#
+#   python3 benchmark-kasiski.py [max_length]
+
+def random_english(length):
+	# sorted, so that the seeded choices do not depend on the set order
+	words = sorted(detectEnglish.getEnglishWords())
+	text, size = [], 0
+	while size < length:
+		word = random.choice(words)
+		text.append(word)
+		size += len(word) + 1
+	return ' '.join(text)[:length]
+
+def benchmark(max_length):
+	random.seed(1204)
+	length, previous = 1000, None
+	print('letters\tseconds\tratio')
+	while length <= max_length:
+		ciphertext = vigenereCipher.encryptMessage('ASIMOV', random_english(length))
+		start = time.time()
+		vigenere3.kasiskiExamination(ciphertext)
+		elapsed = time.time() - start
+		if previous == None:
+			print('%s\t%.4f' % (length, elapsed))
+		else:
+			print('%s\t%.4f\t%.2f' % (length, elapsed, elapsed / previous))
+		length, previous = length * 2, elapsed
+
+if __name__ == '__main__':
+	if len(sys.argv) > 1:
+		benchmark(int(sys.argv[1]))
+	else:
+		benchmark(64000)
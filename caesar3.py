@@ -1,37 +1,78 @@
 # Caesar Cipher Hacker
 # http://inventwithpython.com/hacking (BSD Licensed)
 
-def breakCaesar(cipher):
-    # print("Contoh: GUVF VF ZL FRPERG ZRFFNTR")
-    # message = input("Cipher: ")
-    message = cipher.upper()
-    LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+import freqAnalysis, fitness3, re
 
-    # loop through every possible key
-    for key in range(len(LETTERS)):
+LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+NONLETTERS_PATTERN = re.compile('[^A-Z]')
 
-        # It is important to set translated to the blank string so that the
-        # previous iteration's value for translated is cleared.
-        translated = ''
 
-        # The rest of the program is the same as the original Caesar program:
+def makeCaesarTable(key):
+    # Returns a str.translate() table that shifts every letter back by key,
+    # keeping its case. Symbols that are not letters are left untouched.
+    shifted = LETTERS[key:] + LETTERS[:key]
+    return str.maketrans(shifted + shifted.lower(), LETTERS + LETTERS.lower())
 
-        # run the encryption/decryption code on each symbol in the message
-        for symbol in message:
-            if symbol in LETTERS:
-                num = LETTERS.find(symbol) # get the number of the symbol
-                num = num - key
+# precompiled decryption tables, CAESAR_TABLES[key] undoes a shift of key
+CAESAR_TABLES = [makeCaesarTable(key) for key in range(len(LETTERS))]
 
-                # handle the wrap-around if num is 26 or larger or less than 0
-                if num < 0:
-                    num = num + len(LETTERS)
 
-                # add number's symbol at the end of translated
-                translated = translated + LETTERS[num]
+def decryptCaesar(key, message):
+    return message.translate(CAESAR_TABLES[key % len(LETTERS)])
 
-            else:
-                # just add the symbol without encrypting/decrypting
-                translated = translated + symbol
 
-        # display the current key being tested, along with its decryption
-        print('[%s] %s' % (key, translated.lower()))
\ No newline at end of file
+def hackCaesar(message, top=3, fitness=False):
+    # Counts the letters of message once and scores all 26 rotations from
+    # that single histogram (chi-squared against English letter frequency).
+    # Only the top best keys are decrypted. Returns a list of
+    # (key, score, plaintext) tuples, best (lowest score) first.
+    # With fitness=True every rotation is decrypted and ranked by quadgram
+    # fitness instead (see fitness3), best (highest score) first; this is
+    # more reliable on short messages.
+    if fitness:
+        results = [(key, None, decryptCaesar(key, message)) for key in range(len(LETTERS))]
+        return fitness3.rank_by_fitness(results)[:top]
+    scores = freqAnalysis.chiSquaredShifts(freqAnalysis.getLetterVector(message))
+    ranked = sorted(range(len(LETTERS)), key=scores.__getitem__)
+
+    results = []
+    for key in ranked[:top]:
+        results.append((key, scores[key], decryptCaesar(key, message)))
+    return results
+
+
+def deriveKeyStreams(letters, crib):
+    # Slides crib (upper case letters only) across letters and returns the
+    # key stream implied at every offset, as a list of strings where entry
+    # i is the key stream if the crib starts at letter i. Instead of one
+    # subtraction per offset, every crib letter is subtracted from the
+    # whole ciphertext at once with one str.translate() call.
+    numOffsets = len(letters) - len(crib) + 1
+    if len(crib) == 0 or numOffsets < 1:
+        return []
+    streams = []
+    for j in range(len(crib)):
+        streams.append(decryptCaesar(LETTERS.find(crib[j]), letters[j:j + numOffsets]))
+    return [''.join(keyStream) for keyStream in zip(*streams)]
+
+
+def cribCaesar(message, crib):
+    # Finds the Caesar keys under which crib, a known fragment of the
+    # plaintext, appears in message. Returns a list of (key, offsets)
+    # tuples, where offsets are the letter offsets the crib fits at, most
+    # supported key first.
+    letters = NONLETTERS_PATTERN.sub('', message.upper())
+    crib = NONLETTERS_PATTERN.sub('', crib.upper())
+    keyOffsets = {}
+    for offset, keyStream in enumerate(deriveKeyStreams(letters, crib)):
+        # a Caesar key stream is a single letter repeated
+        if keyStream == keyStream[0] * len(keyStream):
+            keyOffsets.setdefault(LETTERS.find(keyStream[0]), []).append(offset)
+    return sorted(keyOffsets.items(), key=lambda keyAndOffsets: len(keyAndOffsets[1]), reverse=True)
+
+
+def breakCaesar(cipher, top=len(LETTERS)):
+    # display the keys from the most to the least English-like, along
+    # with their score and decryption
+    for key, score, translated in hackCaesar(cipher, top):
+        print('[%s] %.2f %s' % (key, score, translated.lower()))
@@ -7,6 +7,7 @@ from affine3 import *
 from vigenere3 import *
 from friedman3 import *
 from reverse3 import *
+from magic3 import *
 
 class Classic3:
 	def __init__(self):
@@ -15,18 +16,33 @@ class Classic3:
 	def reverses(self, cipher):
 		print(reverse(cipher))
 
-	def caesar(self, cipher):
-		breakCaesar(cipher)
+	def caesar(self, cipher, top=26):
+		breakCaesar(cipher, top)
 
 	def pediaphone(self, cipher):
 		print(decryptPediaphone(cipher))
 
+	def pediaphone_split(self, cipher):
+		breakPediaphone(cipher)
+
+	def pediaphone_stream(self, cipher, output=None):
+		breakPediaphoneStream(cipher, output)
+
 	def bacon(self, cipher):
 		decryptBacon(cipher)
 
+	def bacon_stream(self, cipher, output=None):
+		breakBaconStream(cipher, output)
+
 	def morse(self, cipher):
 		print(decryptMorse(cipher))
 
+	def morse_split(self, cipher):
+		breakMorse(cipher)
+
+	def morse_stream(self, cipher, output=None):
+		breakMorseStream(cipher, output)
+
 	def transpose(self, cipher):
 		breakTranspose(cipher)
 
@@ -36,5 +52,11 @@ class Classic3:
 	def vigenere(self, cipher):
 		breakVigenere(cipher)
 
+	def vigenere_stream(self, cipher, output=None):
+		breakVigenereStream(cipher, output)
+
 	def friedman(self, cipher):
 		friedman_test(cipher)
+
+	def magic(self, cipher):
+		break_magic(cipher)
@@ -1,11 +1,26 @@
+import os, sys
+
 from alphabet3 import *
+import stream3
 
 class Converter3:
 	def __init__(self):
 		pass
 
-	def alphabet_to_numbers(self, word):
-		print(alphabet_to_number(word))
+	# A word (or numbers) that names an existing file is converted chunk
+	# by chunk, so large dumps never have to fit in memory.
+	def alphabet_to_numbers(self, word, alphabet=ALPHABET, base=1):
+		if os.path.isfile(word):
+			for converted in alphabet_to_number_stream(stream3.read_chunks(word), alphabet, base):
+				sys.stdout.write(converted)
+			print()
+		else:
+			print(alphabet_to_number(word, alphabet, base))
 
-	def number_to_alphabets(self, numbers):
-		print(number_to_alphabet(numbers))
\ No newline at end of file
+	def number_to_alphabets(self, numbers, alphabet=ALPHABET, base=1):
+		if os.path.isfile(numbers):
+			for converted in number_to_alphabet_stream(stream3.read_chunks(numbers), alphabet, base):
+				sys.stdout.write(converted)
+			print()
+		else:
+			print(number_to_alphabet(numbers, alphabet, base))
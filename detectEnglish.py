@@ -4,53 +4,111 @@
 # To use, type this code:
 #   import detectEnglish
 #   detectEnglish.isEnglish(someString) # returns True or False
-# (There must be a "dictionary.txt" file in this directory with all English
-# words in it, one word per line. You can download this from
+# (There must be an "asset/dict.txt" file next to this module with all
+# English words in it, one word per line. You can download this from
 # http://invpy.com/dictionary.txt)
+import os
+
 UPPERLETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
 LETTERS_AND_SPACE = UPPERLETTERS + UPPERLETTERS.lower() + ' \t\n'
 
+
+class FilterTable(dict):
+    # str.translate() table that deletes every character it has no entry
+    # for. A dict cannot list "everything else", so the missing ones are
+    # looked up once through __missing__() and remembered, after which
+    # str.translate() finds them without calling back into Python.
+    def __missing__(self, key):
+        self[key] = None
+        return None
+
+# keeps letters and whitespace, and keeps their case
+LETTERS_AND_SPACE_TABLE = FilterTable((ord(symbol), symbol) for symbol in LETTERS_AND_SPACE)
+# keeps letters and whitespace, and upper-cases the letters
+UPPER_LETTERS_AND_SPACE_TABLE = FilterTable((ord(symbol), symbol.upper()) for symbol in LETTERS_AND_SPACE)
+# The dictionary is found next to this module, not in the current directory.
+DICTIONARY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'asset', 'dict.txt')
+
+englishWords = None  # filled on first use by getEnglishWords()
+
 def loadDictionary():
-    dictionaryFile = open('asset/dict.txt')
-    englishWords = {}
-    for word in dictionaryFile.read().split('\n'):
-        englishWords[word] = None
+    # Returns the set of English words of DICTIONARY_FILE. Parsing the
+    # text file into a frozenset takes about as long as unpickling one, so
+    # there is no compiled copy to keep up to date.
+    dictionaryFile = open(DICTIONARY_FILE)
+    words = frozenset(dictionaryFile.read().split())
     dictionaryFile.close()
+    return words
+
+
+def getEnglishWords():
+    # Loads the dictionary on first use only, so importing this module
+    # (and every command that does not need English detection) stays fast.
+    global englishWords
+    if englishWords == None:
+        englishWords = loadDictionary()
     return englishWords
 
-ENGLISH_WORDS = loadDictionary()
-# print ENGLISH_WORDS 
+
+def __getattr__(name):
+    # ENGLISH_WORDS used to be loaded at import time, keep it available.
+    if name == 'ENGLISH_WORDS':
+        return getEnglishWords()
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
 
 
 def getEnglishCount(message):
-    message = message.upper()
-    message = removeNonLetters(message)
-    possibleWords = message.split()
+    possibleWords = message.translate(UPPER_LETTERS_AND_SPACE_TABLE).split()
 
     if possibleWords == []:
         return 0.0  # no words at all, so return 0.0
 
+    englishWords = getEnglishWords()
     matches = 0
     for word in possibleWords:
-        if word in ENGLISH_WORDS:
+        if word in englishWords:
             matches += 1
     return float(matches) / len(possibleWords)
 
 
 def removeNonLetters(message):
-    lettersOnly = []
-    for symbol in message:
-        if symbol in LETTERS_AND_SPACE:
-            lettersOnly.append(symbol)
-    return ''.join(lettersOnly)
+    return message.translate(LETTERS_AND_SPACE_TABLE)
+
+
+def checkEnglish(message, wordPercentage=20, letterPercentage=85):
+    # Same test as isEnglish(), but stops looking up words as soon as the
+    # outcome is certain: once enough words matched to reach
+    # wordPercentage, or once too few words are left to reach it. The
+    # message is filtered and upper-cased in one str.translate() pass,
+    # which also gives the letter count, so a message that fails the
+    # letter test is rejected before any word is looked up. Returns a
+    # (isEnglish, inspected) tuple, where inspected is the fraction of the
+    # words that had to be looked up in the dictionary.
+    lettersOnly = message.translate(UPPER_LETTERS_AND_SPACE_TABLE)
+    if len(message) == 0 or len(lettersOnly) * 100 < letterPercentage * len(message):
+        return False, 0.0
+
+    possibleWords = lettersOnly.split()
+    numWords = len(possibleWords)
+    if numWords == 0:
+        return wordPercentage <= 0, 0.0  # getEnglishCount() would be 0.0
+
+    # In integers: the words match when matches * 100 >= neededScore.
+    neededScore = wordPercentage * numWords
+    englishWords = getEnglishWords()
+    matches = 0
+    for checked, word in enumerate(possibleWords, 1):
+        if word in englishWords:
+            matches += 1
+            if matches * 100 >= neededScore:
+                return True, float(checked) / numWords
+        elif (matches + numWords - checked) * 100 < neededScore:
+            return False, float(checked) / numWords
+    return matches * 100 >= neededScore, 1.0
 
 
 def isEnglish(message, wordPercentage=20, letterPercentage=85):
     # By default, 20% of the words must exist in the dictionary file, and
     # 85% of all the characters in the message must be letters or spaces
     # (not punctuation or numbers).
-    wordsMatch = getEnglishCount(message) * 100 >= wordPercentage
-    numLetters = len(removeNonLetters(message))
-    messageLettersPercentage = float(numLetters) / len(message) * 100
-    lettersMatch = messageLettersPercentage >= letterPercentage
-    return wordsMatch and lettersMatch
+    return checkEnglish(message, wordPercentage, letterPercentage)[0]
@@ -1,17 +1,89 @@
-import base64, binascii
+import binascii, codecs, os, re
+
+import stream3
+
+WHITESPACE = b' \t\n\r\x0b\x0c'
+# kind -> (binascii decoder, characters per aligned group, pattern of the
+# first byte that is not part of the encoding)
+DECODERS = {
+	'b64': (binascii.a2b_base64, 4, re.compile(rb'[^A-Za-z0-9+/=\s]')),
+	'hex': (binascii.a2b_hex, 2, re.compile(rb'[^0-9A-Fa-f\s]')),
+}
+PADDING_END = re.compile(rb'=[=\s]*[^=\s]')  # data after base64 padding
+AFTER_PADDING = re.compile(rb'[^=\s]')
+
+class DecodeError(ValueError):
+	# Invalid encoded data, offset is the position of the first bad byte
+	# in the input (counting whitespace).
+	def __init__(self, offset, message):
+		ValueError.__init__(self, 'Invalid data at offset %d: %s' % (offset, message))
+		self.offset = offset
+
+def decode_stream(chunks, kind):
+	# Decodes an iterable of byte chunks of base64 ('b64') or hex ('hex')
+	# and yields the decoded bytes chunk by chunk. Whitespace is ignored.
+	# Every chunk is decoded up to the last complete group with a single
+	# binascii call and the rest is carried over, so memory stays bounded
+	# by the chunk size. Missing base64 padding at the end is accepted.
+	# Raises DecodeError at the first invalid byte.
+	decode, group, invalid = DECODERS[kind]
+	offset, pending, padded = 0, b'', False
+	for chunk in chunks:
+		match = invalid.search(chunk)
+		if match != None:
+			raise DecodeError(offset + match.start(), 'unexpected %r' % chunk[match.start():match.start() + 1])
+		if kind == 'b64':
+			match = (AFTER_PADDING if padded else PADDING_END).search(chunk)
+			if match != None:
+				raise DecodeError(offset + match.end() - 1, 'data after padding')
+			padded = padded or b'=' in chunk
+		data = pending + chunk.translate(None, WHITESPACE)
+		end = len(data) - len(data) % group
+		try:
+			yield decode(data[:end])
+		except binascii.Error as error:
+			raise DecodeError(offset, str(error))
+		pending = data[end:]
+		offset += len(chunk)
+	if pending != b'':
+		try:
+			if kind == 'hex':
+				raise binascii.Error('odd number of hex digits')
+			yield decode(pending + b'=' * (-len(pending) % group))
+		except binascii.Error as error:
+			raise DecodeError(offset - len(pending), str(error))
+
+def decode_text(chunks):
+	# Turns decoded byte chunks into text, a UTF-8 character split between
+	# two chunks is kept whole and bytes that are not UTF-8 become U+FFFD.
+	decoder = codecs.getincrementaldecoder('utf-8')('replace')
+	for chunk in chunks:
+		yield decoder.decode(chunk)
+	yield decoder.decode(b'', True)
 
 class Encoding3:
 	def __init__(self):
 		pass
 
 	def b642asc(self,b64):
-		try:
-			return (binascii.a2b_base64(b64)).decode()
-		except:
-			return None
+		return ''.join(decode_text(decode_stream([b64.encode('utf-8')], 'b64')))
 
 	def hex2asc(self,hexa):
+		return ''.join(decode_text(decode_stream([hexa.encode('utf-8')], 'hex')))
+
+	def decode(self, kind, data, output=None):
+		# Decodes data, or the file it names ('-' is standard input), chunk
+		# by chunk. The text is shown on the screen; with an output path
+		# the raw bytes are written there instead.
+		if data == '-' or os.path.isfile(data):
+			chunks = decode_stream(stream3.read_chunks(data, stream3.CHUNK_SIZE, 'rb'), kind)
+		else:
+			chunks = decode_stream([data.encode('utf-8')], kind)
 		try:
-			return (binascii.a2b_hex(hexa)).decode()
-		except:
-			return None
\ No newline at end of file
+			if output == None:
+				stream3.write_chunks(decode_text(chunks))
+				print()
+			else:
+				stream3.write_chunks(chunks, output, 'wb')
+		except DecodeError as error:
+			print('\n%s' % (error))
@@ -0,0 +1,99 @@
+import array, collections, math
+
+import detectEnglish
+
+# N-gram log-probability fitness. The tables are built once per process
+# from the words of the English dictionary and kept as flat arrays of
+# log10 probabilities, indexed by the n-gram read as a base-26 integer
+# (AAAA = 0, AAAB = 1, ..., ZZZZ = 26 ** 4 - 1). N-grams are taken within
+# words only, so the score of a text does not depend on its spacing.
+
+LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+# maps A-Z and a-z to the bytes 0-25 and everything else to BOUNDARY
+BOUNDARY = 26
+LETTER_CODES = bytes([LETTERS.find(chr(i).upper()) if chr(i) in LETTERS + LETTERS.lower() else BOUNDARY for i in range(256)])
+
+tables = {}  # n -> array of log10 probabilities, see get_table()
+floors = {}  # n -> log10 probability given to unseen n-grams
+UNSEEN_SCORE = -4.0  # next_letter_score() of a letter that makes an unseen n-gram
+
+def build_table(n):
+	# Counts every n-gram inside the dictionary words and converts the
+	# counts to log10 probabilities. N-grams that never occur get the log
+	# of a small floor count instead of minus infinity.
+	counts = collections.Counter()
+	for word in detectEnglish.getEnglishWords():
+		for i in range(len(word) - n + 1):
+			counts[word[i:i + n]] += 1
+	total = float(sum(counts.values()))
+	floors[n] = math.log10(0.01 / total)
+	table = array.array('d', [floors[n]]) * (26 ** n)
+	for gram, count in counts.items():
+		if gram.isalpha() and gram.isupper() and gram.isascii():
+			table[gram_index(gram)] = math.log10(count / total)
+	return table
+
+def gram_index(gram):
+	index = 0
+	for letter in gram:
+		index = index * 26 + LETTERS.find(letter)
+	return index
+
+def get_table(n=4):
+	# Builds the table for n-grams of length n on first use only.
+	if n not in tables:
+		tables[n] = build_table(n)
+	return tables[n]
+
+def ngram_indexes(text, n=4):
+	# Returns the base-26 index of every n-gram of letters in text that
+	# does not cross a word boundary. The text is mapped to letter codes
+	# with one bytes.translate() call; non-ASCII characters are boundaries.
+	codes = text.encode('ascii', 'replace').translate(LETTER_CODES)
+	if n == 2:
+		return [a * 26 + b for a, b in zip(codes, codes[1:]) if a != BOUNDARY and b != BOUNDARY]
+	if n == 3:
+		return [(a * 26 + b) * 26 + c for a, b, c in zip(codes, codes[1:], codes[2:]) if BOUNDARY not in (a, b, c)]
+	return [((a * 26 + b) * 26 + c) * 26 + d for a, b, c, d in zip(codes, codes[1:], codes[2:], codes[3:]) if BOUNDARY not in (a, b, c, d)]
+
+def ngram_score(text, n=4):
+	# Sum of the log10 probabilities of the n-grams of text (n is 2, 3 or
+	# 4). Higher is more English-like; only compare texts of equal length.
+	return sum(map(get_table(n).__getitem__, ngram_indexes(text, n)))
+
+def fitness(text, n=4):
+	# Mean log10 probability per n-gram, comparable between texts of
+	# different lengths. Texts without a single n-gram get the floor.
+	table = get_table(n)
+	indexes = ngram_indexes(text, n)
+	if indexes == []:
+		return floors[n]
+	return sum(map(table.__getitem__, indexes)) / len(indexes)
+
+def next_letter_score(context, letter):
+	# log10 probability of letter (0-25) following context, the last
+	# letters of the word as a (base-26 index, number of letters) tuple
+	# from next_context(), using at most three letters of context. Used to
+	# score a text one letter at a time while it is being built.
+	index, length = context
+	gram = index * 26 + letter
+	log_probability = get_table(length + 1)[gram]
+	if log_probability == floors[length + 1]:
+		return UNSEEN_SCORE
+	if length == 0:
+		return log_probability
+	return log_probability - get_table(length)[index]
+
+def next_context(context, letter):
+	# The context after letter, see next_letter_score(). (0, 0) is the
+	# context at the start of a word.
+	index, length = context
+	return (index * 26 + letter) % (26 ** 3), min(length + 1, 3)
+
+def rank_by_fitness(results, n=4):
+	# Re-ranks a list of (key, score, plaintext) tuples, as returned by
+	# the breakers, by the fitness of the plaintext. Returns a new list of
+	# (key, fitness, plaintext) tuples, best first.
+	ranked = [(key, fitness(plaintext, n), plaintext) for key, score, plaintext in results]
+	ranked.sort(key=lambda result: result[1], reverse=True)
+	return ranked
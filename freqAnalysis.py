@@ -1,65 +1,45 @@
 # Frequency Finder
 # http://inventwithpython.com/hacking (BSD Licensed)
 
-
+import collections
 
 # frequency taken from http://en.wikipedia.org/wiki/Letter_frequency
 englishLetterFreq = {'E': 12.70, 'T': 9.06, 'A': 8.17, 'O': 7.51, 'I': 6.97, 'N': 6.75, 'S': 6.33, 'H': 6.09, 'R': 5.99, 'D': 4.25, 'L': 4.03, 'C': 2.78, 'U': 2.76, 'M': 2.41, 'W': 2.36, 'F': 2.23, 'G': 2.02, 'Y': 1.97, 'P': 1.93, 'B': 1.29, 'V': 0.98, 'K': 0.77, 'J': 0.15, 'X': 0.15, 'Q': 0.10, 'Z': 0.07}
 ETAOIN = 'ETAOINSHRDLCUMWFGYPBVKJXQZ'
 LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+# englishLetterFreq as fractions, indexed A=0 .. Z=25
+ENGLISH_FREQ_VECTOR = [englishLetterFreq[letter] / 100.0 for letter in LETTERS]
+
+# bytes.translate() arguments that turn the ASCII letters of a message into
+# the bytes 0-25 (A=0 .. Z=25, either case) and delete every other byte
+LETTER_INDEX_TABLE = bytes.maketrans((LETTERS + LETTERS.lower()).encode('ascii'), bytes(range(26)) * 2)
+NONLETTER_BYTES = bytes([i for i in range(256) if chr(i) not in LETTERS + LETTERS.lower()])
+# separates the messages of a batch, see getLetterVectors(); it is never
+# produced by encoding to ASCII, nor by LETTER_INDEX_TABLE
+BATCH_SEPARATOR = b'\xff'
+BATCH_NONLETTER_BYTES = NONLETTER_BYTES.replace(BATCH_SEPARATOR, b'')
+# sort key of letters with the same count: the least common in English first
+ETAOIN_TIE_ORDER = [-ETAOIN.find(letter) for letter in LETTERS]
 
 
 
 def getLetterCount(message):
     # Returns a dictionary with keys of single letters and values of the
     # count of how many times they appear in the message parameter.
-    letterCount = {'A': 0, 'B': 0, 'C': 0, 'D': 0, 'E': 0, 'F': 0, 'G': 0, 'H': 0, 'I': 0, 'J': 0, 'K': 0, 'L': 0, 'M': 0, 'N': 0, 'O': 0, 'P': 0, 'Q': 0, 'R': 0, 'S': 0, 'T': 0, 'U': 0, 'V': 0, 'W': 0, 'X': 0, 'Y': 0, 'Z': 0}
-
-    for letter in message.upper():
-        if letter in LETTERS:
-            letterCount[letter] += 1
-
-    return letterCount
-
-
-def getItemAtIndexZero(x):
-    return x[0]
+    return dict(zip(LETTERS, getLetterVector(message)))
 
 
 def getFrequencyOrder(message):
     # Returns a string of the alphabet letters arranged in order of most
     # frequently occurring in the message parameter.
+    return getFrequencyOrderFromVector(getLetterVector(message))
 
-    # first, get a dictionary of each letter and its frequency count
-    letterToFreq = getLetterCount(message)
 
-    # second, make a dictionary of each frequency count to each letter(s)
-    # with that frequency
-    freqToLetter = {}
-    for letter in LETTERS:
-        if letterToFreq[letter] not in freqToLetter:
-            freqToLetter[letterToFreq[letter]] = [letter]
-        else:
-            freqToLetter[letterToFreq[letter]].append(letter)
-
-    # third, put each list of letters in reverse "ETAOIN" order, and then
-    # convert it to a string
-    for freq in freqToLetter:
-        freqToLetter[freq].sort(key=ETAOIN.find, reverse=True)
-        freqToLetter[freq] = ''.join(freqToLetter[freq])
-
-    # fourth, convert the freqToLetter dictionary to a list of tuple
-    # pairs (key, value), then sort them
-    freqPairs = list(freqToLetter.items())
-    freqPairs.sort(key=getItemAtIndexZero, reverse=True)
-
-    # fifth, now that the letters are ordered by frequency, extract all
-    # the letters for the final string
-    freqOrder = []
-    for freqPair in freqPairs:
-        freqOrder.append(freqPair[1])
-
-    return ''.join(freqOrder)
+def getFrequencyOrderFromVector(letterVector):
+    # Sorts the letters by count, most frequent first. Letters with the
+    # same count are put in reverse "ETAOIN" order.
+    order = sorted(zip([-count for count in letterVector], ETAOIN_TIE_ORDER, LETTERS))
+    return ''.join([letter for negativeCount, tieOrder, letter in order])
 
 
 def englishFreqMatchScore(message):
@@ -68,7 +48,12 @@ def englishFreqMatchScore(message):
     # letter frequency. A "match" is how many of its six most frequent
     # and six least frequent letters is among the six most frequent and
     # six least frequent letters for English.
-    freqOrder = getFrequencyOrder(message)
+    return englishFreqMatchScoreFromVector(getLetterVector(message))
+
+
+def englishFreqMatchScoreFromVector(letterVector):
+    # Same as englishFreqMatchScore(), from the counts of getLetterVector().
+    freqOrder = getFrequencyOrderFromVector(letterVector)
 
     matchScore = 0
     # Find how many matches for the six most common letters there are.
@@ -80,4 +65,58 @@ def englishFreqMatchScore(message):
         if uncommonLetter in freqOrder[-6:]:
             matchScore += 1
 
-    return matchScore
\ No newline at end of file
+    return matchScore
+
+
+def getLetterVector(message):
+    # Returns a list of 26 counts, one per letter A-Z, of how many times
+    # each letter appears in the message parameter (case-insensitive).
+    # One bytes.translate() call turns the letters into the indexes 0-25
+    # and drops everything else, then collections.Counter counts them.
+    counts = collections.Counter(message.encode('ascii', 'ignore').translate(LETTER_INDEX_TABLE, NONLETTER_BYTES))
+    return [counts[i] for i in range(26)]
+
+
+def getLetterVectors(messages):
+    # Batch version of getLetterVector(), e.g. for every candidate
+    # decryption of a brute-force search. All the messages are encoded and
+    # translated in one call, so the per-message cost is only the count.
+    # Returns a list with one letter vector per message.
+    if len(messages) == 0:
+        return []
+    joined = BATCH_SEPARATOR.join([message.encode('ascii', 'ignore') for message in messages])
+    letterVectors = []
+    for indexes in joined.translate(LETTER_INDEX_TABLE, BATCH_NONLETTER_BYTES).split(BATCH_SEPARATOR):
+        counts = collections.Counter(indexes)
+        letterVectors.append([counts[i] for i in range(26)])
+    return letterVectors
+
+
+def englishFreqMatchScores(messages):
+    # Batch version of englishFreqMatchScore(), returns one score per
+    # message.
+    return [englishFreqMatchScoreFromVector(letterVector) for letterVector in getLetterVectors(messages)]
+
+
+def chiSquared(letterVector, shift=0):
+    # Returns the chi-squared statistic comparing the letter counts in
+    # letterVector, rotated back by shift positions, with English letter
+    # frequency. Lower is more English-like.
+    total = sum(letterVector)
+    if total == 0:
+        return 0.0
+
+    score = 0.0
+    for i in range(26):
+        # letter i of letterVector stands for plaintext letter i - shift
+        expected = total * ENGLISH_FREQ_VECTOR[(i - shift) % 26]
+        diff = letterVector[i] - expected
+        score += diff * diff / expected
+    return score
+
+
+def chiSquaredShifts(letterVector):
+    # Returns a list of 26 chi-squared statistics, where entry k is the
+    # score of the plaintext produced by shifting every letter counted in
+    # letterVector back by k (e.g. the Caesar key k).
+    return [chiSquared(letterVector, shift) for shift in range(26)]
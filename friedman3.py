@@ -1,60 +1,96 @@
 # Author: Yana Permana
 
-def friedman_test(cipher):
-	cipher, letter, my_list, total_char = cipher.lower(), ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l', 'm', 'n', 'o', 'p', 'q', 'r', 's', 't', 'u', 'v', 'w', 'x', 'y', 'z'], [], len(cipher)
-
-	for i in range(26):
-		x = 0
-		for y in cipher:
-			if y == letter[i]:
-				x += 1
-		my_list.append(x)
-
-	n, i, j, sigma, sigmas, temp = len(my_list), 0, 0, 0, 0, ''
-
-	for i in range(n, 0, -1):
-		for j in range(0, n - 1, 1):
-			if my_list[j] < my_list[j + 1]:
-				temp = my_list[j]
-				my_list[j] = my_list[j + 1]
-				my_list[j + 1] = temp
-				temp_letter = letter[j]
-				letter[j] = letter[j + 1]
-				letter[j + 1] = temp_letter
-			
-	print('Statistics:')
-	print('i \tn \tn-1 \tn(n-1)')
-	for i in range(0, n, 1):
-		sigma += int(my_list[i])
-		n_ = int(my_list[i]) - 1
-		subs = n_ * int(my_list[i])
-		sigmas += subs
-		print(letter[i], ' \t', my_list[i], ' \t', n_ , ' \t', subs)
-		
+import collections, re
+
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+NONLETTERS_PATTERN = re.compile('[^a-z]')
+MAX_PERIOD = 16  # periods of the IC profile, same as vigenere3.MAX_KEY_LENGTH
+
+def friedman_key_length(sigma, F):
+	# Friedman estimate of the key length from the number of letters sigma
+	# and their index of coincidence F.
+	divisor = ((sigma-1) * F) - ((0.038 * sigma) + 0.065)
+	if divisor == 0:
+		return float('inf')
+	return (0.027 * sigma) / divisor
+
+def index_of_coincidence(counts):
+	# Probability that two letters drawn from a text with these letter
+	# counts are the same: sum(n(n-1)) / (N(N-1)).
+	total = sum(counts)
+	if total < 2:
+		return 0.0
+	return float(sum([count * (count - 1) for count in counts])) / (total * (total - 1))
 
-	print(' \t', sigma, ' \t', ' \t', sigmas)
+def periodic_ic(letters, max_period=MAX_PERIOD):
+	# IC profile of letters (a string of letters only): entry p - 1 is the
+	# mean IC of the p columns letters[0::p], letters[1::p], ... for every
+	# period p from 1 to max_period. The columns of a polyalphabetic cipher
+	# look like English (IC near 0.067) when p is a multiple of the key
+	# length.
+	profile = []
+	for period in range(1, max_period + 1):
+		column_ics = [index_of_coincidence(list(collections.Counter(letters[column::period]).values())) for column in range(period)]
+		profile.append(sum(column_ics) / period)
+	return profile
 
-	sigma = float(sigma)
-	divisor = float((sigma)*(sigma-1))
-	sigmas = float(sigmas)
+def friedman_analysis(cipher, max_period=MAX_PERIOD):
+	# Friedman test of cipher. The letters are counted in one pass, the
+	# result is a dict with:
+	#   counts      list of (letter, count) for a-z, most frequent first
+	#   total_char  length of cipher
+	#   letters     number of letters (sigma)
+	#   coincidences  sum of n(n-1) over the letter counts
+	#   ic          index of coincidence F
+	#   poly        True when F points to a polyalphabetic cipher
+	#   key_length  Friedman estimate of the key length (a float)
+	#   periodic_ic IC for every period 1..max_period, see periodic_ic()
+	letters = NONLETTERS_PATTERN.sub('', cipher.lower())
+	letter_count = collections.Counter(letters)
+	counts = sorted([(letter, letter_count[letter]) for letter in LETTERS], key=lambda letter_and_count: letter_and_count[1], reverse=True)
+	sigma = len(letters)
+	F = index_of_coincidence([count for letter, count in counts])
+	return {
+		'counts': counts,
+		'total_char': len(cipher),
+		'letters': sigma,
+		'coincidences': sum([count * (count - 1) for letter, count in counts]),
+		'ic': F,
+		'poly': F > 0.0385 and F < 0.065,
+		'key_length': friedman_key_length(sigma, F),
+		'periodic_ic': periodic_ic(letters, max(1, min(max_period, sigma))),
+	}
 
-	print('\nTotal character:', total_char)
+def print_friedman(result):
+	print('Statistics:')
+	print('i \tn \tn-1 \tn(n-1)')
+	for letter, count in result['counts']:
+		print(letter, ' \t', count, ' \t', count - 1, ' \t', count * (count - 1))
+
+	print(' \t', result['letters'], ' \t', ' \t', result['coincidences'])
 
-	F = float(sigmas / divisor)
-	print('F:', F)
+	print('\nTotal character:', result['total_char'])
+	print('F:', result['ic'])
 
-	if F > 0.0385 and F < 0.065:
+	if result['poly']:
 		print('Type: Poly-Alphabetical')
 	else:
 		print('Type: Mono-Alphabetical')
 
-	I = (0.027 * sigma) / ( ((sigma-1) * F) - ((0.038 * sigma) + 0.065) )
+	I = result['key_length']
+	if I == float('inf'):
+		print('Key Length:', I)
+	else:
+		print('Key Length:', I,'~',round(I))
+		if round(I) == 5:
+			print("Uses Kasiski Method")
+
+	print('\nPeriod \tIC')
+	for period, ic in enumerate(result['periodic_ic'], 1):
+		print(period, ' \t', round(ic, 4))
 
-	print('Key Length:', I,'~',round(I))
-	key_length = round(I)
-	
-	if key_length == 5:
-		print("Uses Kasiski Method")
+def friedman_test(cipher):
+	print_friedman(friedman_analysis(cipher))
 
 if __name__ == '__main__':
 	cipher = """qp tbtw, ixn sgjrgatvlt jwon lumi ftmc snfu, csh cuii gtkwb azoowaz... yws abkcp nca..."""
@@ -1,69 +1,84 @@
-import sys
+import string, sys
+
+import stream3
+
+# the character classes that can be gathered, as the bytes they keep
+CLASSES = {
+	'digit': string.digits.encode('ascii'),
+	'lower': string.ascii_lowercase.encode('ascii'),
+	'upper': string.ascii_uppercase.encode('ascii'),
+	'upperdigit': (string.ascii_uppercase + string.digits).encode('ascii'),
+	'lowerdigit': (string.ascii_lowercase + string.digits).encode('ascii'),
+}
+
+def delete_table(keep):
+	# bytes.translate() delete argument that removes every byte not in keep
+	return bytes([i for i in range(256) if i not in keep])
+
+DELETE_TABLES = dict([(name, delete_table(keep)) for name, keep in CLASSES.items()])
+
+def class_table(character_class):
+	# A class is one of the names in CLASSES, or a custom set of
+	# characters given as a string or bytes (e.g. 'abc' or b'01'). Files
+	# are matched byte by byte, so a custom set must be ASCII: a character
+	# such as 'é' is several bytes in UTF-8 and would never match. Raises
+	# ValueError otherwise.
+	if character_class in DELETE_TABLES:
+		return DELETE_TABLES[character_class]
+	if not character_class.isascii():
+		raise ValueError('Custom class %r is not ASCII' % (character_class))
+	if isinstance(character_class, str):
+		character_class = character_class.encode('ascii')
+	return delete_table(character_class)
+
+def gather(filename, classes, chunk_size=stream3.CHUNK_SIZE):
+	# Reads the file once, in binary chunks, and returns a generator that
+	# yields for every chunk a list with the characters of each class in
+	# classes, in that order. Each class is one bytes.translate() call per
+	# chunk, so nothing is examined character by character in Python and
+	# the whole file is never held in memory. The classes are checked
+	# before anything is read (see class_table()).
+	tables = [class_table(character_class) for character_class in classes]
+	return gather_chunks(stream3.read_chunks(filename, chunk_size, 'rb'), tables)
+
+def gather_chunks(chunks, tables):
+	for chunk in chunks:
+		yield [chunk.translate(None, table) for table in tables]
+
+def gather_to_files(filename, outputs, chunk_size=stream3.CHUNK_SIZE):
+	# Gathers several classes in one pass and streams each to its own
+	# file. outputs is a list of (class, output path) tuples.
+	gathered = gather(filename, [character_class for character_class, path in outputs], chunk_size)
+	output_files = [open(path, 'wb') for character_class, path in outputs]
+	for pieces in gathered:
+		for output_file, piece in zip(output_files, pieces):
+			output_file.write(piece)
+	for output_file in output_files:
+		output_file.close()
+
+def gather_to_stdout(filename, character_class):
+	# Streams one class of the file to the screen.
+	for pieces in gather(filename, [character_class]):
+		sys.stdout.write(pieces[0].decode('ascii'))
+	sys.stdout.write('\n')
+
+def gather_class(filename, character_class):
+	return b''.join([pieces[0] for pieces in gather(filename, [character_class])]).decode('ascii')
 
 def gather_digit(filename):
-	array, files = [], open(filename)
-	for lines in files:
-		lists = lines.rstrip().split()
-		for i in range(0, len(lists), 1):
-			word = lists[i]
-			for j in range(0, len(word), 1):
-				if word[j].isdigit() == True:
-					array.append(word[j])
-		return ''.join(array)
-		i += 1
-	files.close()
+	return gather_class(filename, 'digit')
 
 def gather_lower(filename):
-	array, files = [], open(filename)
-	for lines in files:
-		lists = lines.rstrip().split()
-		for i in range(0, len(lists), 1):
-			word = lists[i]
-			for j in range(0, len(word), 1):
-				if word[j].islower() == True:
-					array.append(word[j])
-		return ''.join(array)
-		i += 1
-	files.close()
+	return gather_class(filename, 'lower')
 
 def gather_upper(filename):
-	array, files = [], open(filename)
-	for lines in files:
-		lists = lines.rstrip().split()
-		for i in range(0, len(lists), 1):
-			word = lists[i]
-			for j in range(0, len(word), 1):
-				if word[j].isupper() == True:
-					array.append(word[j])
-		return ''.join(array)
-		i += 1
-	files.close()
+	return gather_class(filename, 'upper')
 
 def gather_upper_digit(filename):
-	array, files = [], open(filename)
-	for lines in files:
-		lists = lines.rstrip().split()
-		for i in range(0, len(lists), 1):
-			word = lists[i]
-			for j in range(0, len(word), 1):
-				if word[j].isupper() == True or word[j].isdigit() == True:
-					array.append(word[j])
-		return ''.join(array)
-		i += 1
-	files.close()
+	return gather_class(filename, 'upperdigit')
 
 def gather_lower_digit(filename):
-	array, files = [], open(filename)
-	for lines in files:
-		lists = lines.rstrip().split()
-		for i in range(0, len(lists), 1):
-			word = lists[i]
-			for j in range(0, len(word), 1):
-				if word[j].islower() == True or word[j].isdigit() == True:
-					array.append(word[j])
-		return ''.join(array)
-		i += 1
-	files.close()
+	return gather_class(filename, 'lowerdigit')
 
 if __name__ == '__main__':
 	filename = sys.argv[1]
@@ -71,4 +86,4 @@ if __name__ == '__main__':
 	print(gather_lower(filename))
 	print(gather_upper(filename))
 	print(gather_upper_digit(filename))
-	print(gather_lower_digit(filename))
\ No newline at end of file
+	print(gather_lower_digit(filename))
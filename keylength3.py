@@ -0,0 +1,83 @@
+# Vigenere Key Length Estimator
+# Combines Kasiski Examination, the Friedman test and the index of
+# coincidence of every candidate period into one ranking of key lengths.
+
+import friedman3
+
+ENGLISH_IC = 0.0667  # index of coincidence of English text
+RANDOM_IC = 0.0385  # index of coincidence of uniformly random letters
+
+# weights of the three estimates in the combined score
+IC_WEIGHT = 0.5
+KASISKI_WEIGHT = 0.35
+FRIEDMAN_WEIGHT = 0.15
+
+
+def estimateKeyLengths(ciphertext, factorsByCount, maxKeyLength):
+    # Returns every key length from 1 to maxKeyLength as a list of
+    # (keyLength, confidence) tuples, most likely first. The confidences
+    # add up to 1. factorsByCount are the Kasiski factor counts of the
+    # ciphertext (see vigenere3.kasiskiFactorCounts()), passed in by the
+    # caller so that this module does not depend on vigenere3. The index
+    # of coincidence profile comes from friedman3.friedman_analysis().
+    analysis = friedman3.friedman_analysis(ciphertext, maxKeyLength)
+    return combineKeyLengthEstimates(analysis['periodic_ic'], factorsByCount, analysis['letters'])
+
+
+def combineKeyLengthEstimates(profile, factorsByCount, numLetters):
+    # Ranks the key lengths 1 to len(profile) from a periodic index of
+    # coincidence profile (see friedman3.periodic_ic()), the Kasiski
+    # factor counts (see vigenere3.kasiskiFactorCounts()) and the number of
+    # letters in the ciphertext. The statistics may come from different
+    # amounts of text, e.g. a streamed file and a sample of it. Returns the
+    # same list as estimateKeyLengths().
+    maxKeyLength = len(profile)
+
+    # Index of coincidence: the columns of the right period look like
+    # English. Multiples of the right period look just as English, so a
+    # period is halved when one of its divisors scores nearly as well.
+    icScores = []
+    for keyLength in range(1, maxKeyLength + 1):
+        score = (profile[keyLength - 1] - RANDOM_IC) / (ENGLISH_IC - RANDOM_IC)
+        icScores.append(min(max(score, 0.0), 1.0))
+    for keyLength in range(2, maxKeyLength + 1):
+        for divisor in range(1, keyLength):
+            if keyLength % divisor == 0 and icScores[divisor - 1] >= 0.85 * icScores[keyLength - 1]:
+                icScores[keyLength - 1] /= 2
+                break
+
+    # Kasiski: a spacing is divisible by a random factor f one time in f,
+    # so the counts are weighted by the factor before being normalized.
+    kasiskiScores = [0.0] * maxKeyLength
+    for factor, count in factorsByCount:
+        if factor <= maxKeyLength:
+            kasiskiScores[factor - 1] = float(count * factor)
+    if max(kasiskiScores) > 0:
+        kasiskiScores = [score / max(kasiskiScores) for score in kasiskiScores]
+    # Every spacing is divisible by 1, so Kasiski says nothing about a key
+    # of length 1. Give it the average score rather than none at all.
+    if maxKeyLength > 1:
+        kasiskiScores[0] = sum(kasiskiScores[1:]) / (maxKeyLength - 1)
+
+    # Friedman: a single estimate, lengths close to it score higher.
+    friedmanEstimate = friedman3.friedman_key_length(numLetters, profile[0])
+    friedmanScores = []
+    for keyLength in range(1, maxKeyLength + 1):
+        if friedmanEstimate > 0:
+            friedmanScores.append(1.0 / (1.0 + abs(keyLength - friedmanEstimate)))
+        else:
+            friedmanScores.append(0.0)
+
+    scores = []
+    for i in range(maxKeyLength):
+        scores.append(IC_WEIGHT * icScores[i] + KASISKI_WEIGHT * kasiskiScores[i] + FRIEDMAN_WEIGHT * friedmanScores[i])
+    total = sum(scores)
+
+    likelyKeyLengths = []
+    for i in range(maxKeyLength):
+        if total > 0:
+            likelyKeyLengths.append((i + 1, scores[i] / total))
+        else:
+            likelyKeyLengths.append((i + 1, 1.0 / maxKeyLength))
+    likelyKeyLengths.sort(key=lambda lengthConfidence: lengthConfidence[1], reverse=True)
+    return likelyKeyLengths
@@ -0,0 +1,183 @@
+import heapq, itertools, re, string, time
+
+import bacon3, caesar3, detectEnglish, encoding3, fitness3, morse3, reverse3
+
+# Chained decoding search: every state is a text, every transform turns a
+# text into a new one (base64, hex, reverse, morse, bacon, the best Caesar
+# key, ROT47). States are explored best first, by how readable they are,
+# and the shortest chain that ends in readable text is reported.
+
+MAX_DEPTH = 6  # transforms in a chain
+TIME_LIMIT = 10.0  # seconds
+MAX_STATES = 20000  # texts explored
+
+BASE64_PATTERN = re.compile(r'[A-Za-z0-9+/]+={0,2}')
+HEX_PATTERN = re.compile(r'(?:[0-9A-Fa-f]{2})+')
+MORSE_PATTERN = re.compile(r'[.\-/\s]+')
+FLAG_PATTERN = re.compile(r'\b[A-Za-z][A-Za-z0-9_]{1,15}\{([A-Za-z0-9_\-!?.@#$%]+)\}')  # e.g. flag{...} or CTF{...}
+# turns a flag body such as 'r3v3rs3d_4nd_3nc0d3d' back into words
+FLAG_BODY_TABLE = str.maketrans('013457_-', 'oieast  ')
+MIN_FLAG_LETTERS = 4  # a shorter flag body is too likely to be a word by chance
+ROT47_TABLE = str.maketrans(''.join([chr(i) for i in range(33, 127)]), ''.join([chr(33 + (i - 33 + 47) % 94) for i in range(33, 127)]))
+# characters of ordinary text, anything else makes a text less readable
+PLAIN = set(string.ascii_letters + string.digits + string.whitespace + '.,:;\'"!?-_{}()')
+# transforms that only apply to encoded text, see is_encoded()
+DECODERS = ['base64', 'hex', 'morse', 'bacon']
+ENGLISH_FITNESS = -4.0  # fitness3.fitness() of ordinary English text
+
+def decode_bytes(data):
+	# The states are text, bytes that are not UTF-8 are taken as a sign
+	# that the decoder does not apply (None), there is nothing more to try
+	# on them anyway.
+	try:
+		return data.decode('utf-8')
+	except UnicodeDecodeError:
+		return None
+
+def from_base64(text):
+	compact = ''.join(text.split())
+	if len(compact) < 4 or len(compact) % 4 == 1 or BASE64_PATTERN.fullmatch(compact) == None:
+		return None
+	return decode_bytes(b''.join(encoding3.decode_stream([compact.encode('ascii')], 'b64')))
+
+def from_hex(text):
+	compact = ''.join(text.split())
+	if HEX_PATTERN.fullmatch(compact) == None:
+		return None
+	return decode_bytes(b''.join(encoding3.decode_stream([compact.encode('ascii')], 'hex')))
+
+def from_morse(text):
+	if MORSE_PATTERN.fullmatch(text) == None or ('.' not in text and '-' not in text):
+		return None
+	return morse3.decryptMorse(text)
+
+def from_bacon(text):
+	# only texts that are nothing but two symbols, the letter case of
+	# any text could hide bits too but that would match everything
+	for mode, table in bacon3.baconModes(text):
+		if mode != 'case':
+			return bacon3.rankBacon(text)[0][2]
+	return None
+
+def from_caesar(text):
+	if caesar3.NONLETTERS_PATTERN.sub('', text.upper()) == '':
+		return None
+	key, score, plaintext = caesar3.hackCaesar(text, 1, fitness=True)[0]
+	return plaintext
+
+def from_rot47(text):
+	return text.translate(ROT47_TABLE)
+
+# (name, function) pairs, a function returns None when it does not apply
+TRANSFORMS = [
+	('base64', from_base64),
+	('hex', from_hex),
+	('morse', from_morse),
+	('bacon', from_bacon),
+	('reverse', reverse3.reverse),
+	('caesar', from_caesar),
+	('rot47', from_rot47),
+]
+
+def readability(text):
+	# Between 0 and 1: the fraction of characters of ordinary text, times
+	# how English the text looks (the larger of its fraction of dictionary
+	# words and its quadgram fitness scaled between the floor and
+	# ENGLISH_FITNESS).
+	if text == '':
+		return 0.0
+	plain = sum([symbol in PLAIN for symbol in text]) / float(len(text))
+	floor = fitness3.fitness('')  # the score of a text without quadgrams
+	fitness = (fitness3.fitness(text) - floor) / (ENGLISH_FITNESS - floor)
+	english = max(detectEnglish.getEnglishCount(text), min(max(fitness, 0.0), 1.0))
+	return plain * (0.3 + 0.7 * english)
+
+def is_flag(text):
+	# Braces survive Caesar and ROT47 (or appear from them), so matching
+	# FLAG_PATTERN is not enough: the body of the flag must read as English
+	# too, once its leetspeak digits are letters and '_' and '-' spaces.
+	for match in FLAG_PATTERN.finditer(text):
+		body = match.group(1).translate(FLAG_BODY_TABLE)
+		if len([symbol for symbol in body if symbol.isalpha()]) >= MIN_FLAG_LETTERS and detectEnglish.isEnglish(body):
+			return True
+	return False
+
+def is_readable(text):
+	return is_flag(text) or detectEnglish.isEnglish(text)
+
+def is_encoded(text):
+	# True when one of the DECODERS still applies to text
+	for name, transform in TRANSFORMS:
+		if name in DECODERS:
+			try:
+				if transform(text) != None:
+					return True
+			except (ValueError, IndexError, ZeroDivisionError):
+				pass
+	return False
+
+def magic(cipher, max_depth=MAX_DEPTH, time_limit=TIME_LIMIT, max_states=MAX_STATES):
+	# Best-first search over chains of TRANSFORMS starting from cipher.
+	# Texts already seen are skipped (a set of the texts), and the search
+	# stops after max_depth transforms per chain, time_limit seconds or
+	# max_states texts. Once a readable text is found, only chains shorter
+	# than it are explored further, so the shortest one wins. Returns
+	# (chain, readable) where chain is a list of (transform, text) steps
+	# leading to the readable text, empty when cipher is readable already.
+	# When there is none, readable is False
+	# and the chain leads to a text that no decoder applies to any more:
+	# the one that went through the most DECODERS (their output is certain,
+	# unlike a Caesar or ROT47 guess), then the most readable one.
+	if is_readable(cipher):
+		return [], True
+	deadline = time.time() + time_limit
+	order = itertools.count()  # breaks ties in the heap, oldest first
+	frontier = [(-readability(cipher), 0, next(order), cipher, [])]
+	seen = set([cipher])
+	best = (0, 0.0, [])
+	found = None
+	while frontier != [] and len(seen) < max_states and time.time() < deadline:
+		score, depth, tie, text, chain = heapq.heappop(frontier)
+		if found != None and depth >= len(found) - 1:
+			continue
+		for name, transform in TRANSFORMS:
+			try:
+				output = transform(text)
+			except (ValueError, IndexError, ZeroDivisionError):
+				continue  # e.g. encoding3.DecodeError, the transform does not apply
+			if output == None or output in seen:
+				continue
+			seen.add(output)
+			steps = chain + [(name, output)]
+			if is_readable(output):
+				if found == None or len(steps) < len(found):
+					found = steps
+				continue
+			outputScore = readability(output)
+			decoded = len([step for step in steps if step[0] in DECODERS])
+			if (decoded, outputScore) > best[:2] and not is_encoded(output):
+				best = (decoded, outputScore, steps)
+			if depth + 1 < max_depth:
+				heapq.heappush(frontier, (-outputScore, depth + 1, next(order), output, steps))
+	if found != None:
+		return found, True
+	return best[2], False
+
+def break_magic(cipher):
+	chain, readable = magic(cipher)
+	if chain == [] and readable:
+		print('Already readable: %s' % (cipher))
+		return chain
+	if chain == []:
+		print('Failed :(')
+		return None
+	if not readable:
+		print('No readable output, the chain that decoded the furthest:')
+	for step, (name, text) in enumerate(chain, 1):
+		print('[%s] %s: %s' % (step, name, text))
+	print('\nChain: %s' % (' -> '.join([name for name, text in chain])))
+	return chain
+
+if __name__ == '__main__':
+	cipher = 'VTIxMFZVNUVaM1JUZWtaMVRrVjNQUT09'
+	break_magic(cipher)
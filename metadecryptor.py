@@ -36,17 +36,24 @@ def helps():
 \t-h\t\tHelp
 \t-author\t\tAuthor
 \t-credit\t\tCredits
-\t-hex\t\tDecode hexadecimal
-\t-b64\t\tDecode base64
-\t-caesar\t\tBreak caesar cipher
+\t-hex\t\tDecode hexadecimal (text, file or - for stdin, optional output file)
+\t-b64\t\tDecode base64 (text, file or - for stdin, optional output file)
+\t-caesar\t\tBreak caesar cipher (--top N shows the N best keys)
 \t-vigenere\tBreak vigenere cipher
+\t-vigenerestream\tBreak one large vigenere file (optional output file)
 \t-affine\t\tBreak affine cipher
 \t-reverse\tDecrypt reverse cipher
-\t-bacon\t\tDecrypt bacon cipher
-\t-morse\t\tDecrypt morse cipher
+\t-bacon\t\tDecrypt bacon cipher (also case, 0/1 or two-glyph cover text)
+\t-baconstream\tDecrypt one large bacon file (optional output file)
+\t-morse\t\tDecrypt morse cipher ('/' separates words)
+\t-morsesplit\tDecrypt morse cipher without letter separators
+\t-morsestream\tDecrypt one large morse file (optional output file)
 \t-pediaphone\tDecrypt pediaphone cipher
+\t-pediasplit\tDecrypt pediaphone taps without separators
+\t-pediastream\tDecrypt one large pediaphone file (optional output file)
 \t-transpose\tDecrypt transpose cipher
 \t-friedman\tIs monoalpabetical or polyalphabetical?
+\t-magic\t\tTry chains of decoders until the output is readable
 
 Factoring Modulus
 ==================
@@ -70,6 +77,7 @@ Strings
 \t-upper\t\tGather Uppercase
 \t-upperdigit\tGather Uppercase and Digit
 \t-lowerdigit\tGather Lowercase and Digit
+\t-gather\t\tGather several classes in one pass (e.g. digit,upper,xyz)
 
 Modern
 ==================
@@ -83,8 +91,9 @@ Converter
 
 \tCommand\t\tDescription
 \t-------\t\t-----------
-\t-alpha2num\tConvert alphabet to number
-\t-num2alpha\tConvert number to alphabet
+\t-alpha2num\tConvert alphabet (or a file) to number
+\t-num2alpha\tConvert number (or a file) to alphabet
+\t\t\t(--base 0 counts from 0, --alphabet S uses another alphabet)
 """);
 
 def credit():
@@ -99,6 +108,15 @@ Thanks to
 \t3\t\tRidwan Fajar S.
 """);
 
+def converter_options():
+	# --alphabet S and --base N of -alpha2num and -num2alpha
+	alphabet, base = ALPHABET, 1
+	if '--alphabet' in sys.argv:
+		alphabet = sys.argv[sys.argv.index('--alphabet') + 1]
+	if '--base' in sys.argv:
+		base = int(sys.argv[sys.argv.index('--base') + 1])
+	return alphabet, base
+
 def main():
 	greeting()
 	try:
@@ -110,25 +128,58 @@ def main():
 			credit()
 		elif sys.argv[1] == '-b64':
 			if sys.argv[2] != '':
-				print(encoding.b642asc(sys.argv[2]))
+				if len(sys.argv) > 3:
+					encoding.decode('b64', sys.argv[2], sys.argv[3])
+				else:
+					encoding.decode('b64', sys.argv[2])
 		elif sys.argv[1] == '-hex':
 			if sys.argv[2] != '':
-				print(encoding.hex2asc(sys.argv[2]))
+				if len(sys.argv) > 3:
+					encoding.decode('hex', sys.argv[2], sys.argv[3])
+				else:
+					encoding.decode('hex', sys.argv[2])
 		elif sys.argv[1] == '-caesar':
 			if sys.argv[2] != '':
-				classic.caesar(sys.argv[2])
+				if '--top' in sys.argv:
+					classic.caesar(sys.argv[2], int(sys.argv[sys.argv.index('--top') + 1]))
+				else:
+					classic.caesar(sys.argv[2])
 		elif sys.argv[1] == '-pediaphone':
 			if sys.argv[2] != '':
 				classic.pediaphone(sys.argv[2])
+		elif sys.argv[1] == '-pediasplit':
+			if sys.argv[2] != '':
+				classic.pediaphone_split(sys.argv[2])
+		elif sys.argv[1] == '-pediastream':
+			if sys.argv[2] != '':
+				if len(sys.argv) > 3:
+					classic.pediaphone_stream(sys.argv[2], sys.argv[3])
+				else:
+					classic.pediaphone_stream(sys.argv[2])
 		elif sys.argv[1] == '-reverse':
 			if sys.argv[2] != '':
 				classic.reverses(sys.argv[2])
 		elif sys.argv[1] == '-bacon':
 			if sys.argv[2] != '':
 				classic.bacon(sys.argv[2])
+		elif sys.argv[1] == '-baconstream':
+			if sys.argv[2] != '':
+				if len(sys.argv) > 3:
+					classic.bacon_stream(sys.argv[2], sys.argv[3])
+				else:
+					classic.bacon_stream(sys.argv[2])
 		elif sys.argv[1] == '-morse':
 			if sys.argv[2] != '':
 				classic.morse(sys.argv[2])
+		elif sys.argv[1] == '-morsesplit':
+			if sys.argv[2] != '':
+				classic.morse_split(sys.argv[2])
+		elif sys.argv[1] == '-morsestream':
+			if sys.argv[2] != '':
+				if len(sys.argv) > 3:
+					classic.morse_stream(sys.argv[2], sys.argv[3])
+				else:
+					classic.morse_stream(sys.argv[2])
 		elif sys.argv[1] == '-transpose':
 			if sys.argv[2] != '':
 				classic.transpose(sys.argv[2])
@@ -138,9 +189,18 @@ def main():
 		elif sys.argv[1] == '-vigenere':
 			if sys.argv[2] != '':
 				classic.vigenere(sys.argv[2])
+		elif sys.argv[1] == '-vigenerestream':
+			if sys.argv[2] != '':
+				if len(sys.argv) > 3:
+					classic.vigenere_stream(sys.argv[2], sys.argv[3])
+				else:
+					classic.vigenere_stream(sys.argv[2])
 		elif sys.argv[1] == '-friedman':
 			if sys.argv[2] != '':
 				classic.friedman(sys.argv[2])
+		elif sys.argv[1] == '-magic':
+			if sys.argv[2] != '':
+				classic.magic(sys.argv[2])
 		elif sys.argv[1] == '-prho':
 			if sys.argv[2] != '':
 				print('(p, q):', factor.pollard_rhos(int(sys.argv[2])))
@@ -174,15 +234,18 @@ def main():
 		elif sys.argv[1] == '-lowerdigit':
 			if sys.argv[2] != '':
 				string.lowerdigits(sys.argv[2])
+		elif sys.argv[1] == '-gather':
+			if sys.argv[2] != '':
+				string.gathers(sys.argv[2], sys.argv[3])
 		elif sys.argv[1] == '-checkRSA':
 			if sys.argv[2] != '':
 				modern.check_RSAs(sys.argv[2])
 		elif sys.argv[1] == '-alpha2num':
 			if sys.argv[2] != '':
-				converter.alphabet_to_numbers(sys.argv[2])
+				converter.alphabet_to_numbers(sys.argv[2], *converter_options())
 		elif sys.argv[1] == '-num2alpha':
 			if sys.argv[2] != '':
-				converter.number_to_alphabets(sys.argv[2])
+				converter.number_to_alphabets(sys.argv[2], *converter_options())
 		else:
 			helps()
 	except:
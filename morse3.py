@@ -1,14 +1,140 @@
+import heapq
+
+import detectEnglish, fitness3, stream3
+
+MORSE_CODE = {'a': '.-', 'b': '-...', 'c': '-.-.', 'd': '-..', 'e': '.', 'f': '..-.', 'g': '--.', 'h': '....', 'i': '..', 'j': '.---', 'k': '-.-', 'l': '.-..', 'm': '--', 'n': '-.', 'o': '---', 'p': '.--.', 'q': '--.-', 'r': '.-.', 's': '...', 't': '-', 'u': '..-', 'v': '...-', 'w': '.--', 'x': '-..-', 'y': '-.--', 'z': '--..', '0': '-----', '1': '.----', '2': '..---', '3': '...--', '4': '....-', '5': '.....', '6': '-....', '7': '--...', '8': '---..', '9': '----.'}
+# code -> symbol, one dict lookup per token
+MORSE_TABLE = dict([(code, symbol) for symbol, code in MORSE_CODE.items()])
+WORD_SEPARATOR = '/'
+
+# The dictionary has no words shorter than three letters, these are the
+# common ones segmentMorse() needs to split a text into words.
+SHORT_WORDS = 'a i am an as at be by do go he if in is it me my no of on or so to up us we'.split()
+WORDS_PER_CODE = 5  # most likely words kept for each Morse code
+BEAM_WIDTH = 20  # partial decodings kept per position by segmentMorse()
+WORD_COST = -2.0  # added to the score of every word, so fewer words are preferred
+LETTER_COST = -6.0  # score of a single letter that is not part of any word
+
+wordCodes = None  # filled on first use by getWordCodes()
+
+def decryptMorseStream(chunks):
+	# Decodes an iterable of text chunks of space separated codes,
+	# yielding the plaintext piece by piece. '/' separates words (runs of
+	# separators give one space) and unknown codes decode to '?'. A code
+	# split between two chunks is carried over to the next one.
+	pending = ''
+	space = True  # no space at the start of the text
+	for chunk in chunks:
+		tokens = (pending + chunk).replace(WORD_SEPARATOR, ' / ').split()
+		pending = ''
+		# only a chunk that ends inside a code can have the rest of it in
+		# the next chunk, a '/' is complete on its own
+		if tokens != [] and not chunk[-1].isspace() and chunk[-1] != WORD_SEPARATOR:
+			pending = tokens.pop()
+		decoded = []
+		for token in tokens:
+			if token == WORD_SEPARATOR:
+				if not space:
+					decoded.append(' ')
+					space = True
+			else:
+				decoded.append(MORSE_TABLE.get(token, '?'))
+				space = False
+		yield ''.join(decoded)
+	if pending != '':
+		yield MORSE_TABLE.get(pending, '?')
+
 def decryptMorse(cipher):
-	morse = ['.-','.---','-.-.','-..','.','..-.','--.','....','..','.---','-.-','.-..','--','-.','---','.--.','--.-','.-.','...','-','..-','...-','.--','-..-','-.--','--..','-----','.----','..---','...--','....-','.....','-....','--...','---..','----.']
-	alphabet = ['a','b','c','d','e','f','g','h','i','j','k','l','m','n','o','p','q','r','s','t','u','v','w','x','y','z','0','1','2','3','4','5','6','7','8','9']
-	myList = cipher.split()
-	myArr = []
-	for i in range(0, len(myList), 1):
-		for j in range(0, len(morse), 1):
-			if myList[i] == morse[j]:
-				myArr.append(alphabet[j])
-	return ''.join(myArr)
-	
+	return ''.join(decryptMorseStream([cipher])).rstrip()
+
+def breakMorseStream(cipher, output=None):
+	# Decodes one large file chunk by chunk and writes it to the output
+	# path (or the screen) as it goes.
+	stream3.write_chunks(decryptMorseStream(stream3.read_chunks(cipher)), output)
+	if output == None:
+		print()  # end the last line on the screen
+
+def wordScore(word):
+	# log10 probability of the letters of word under the n-gram model of
+	# fitness3.next_letter_score(), plus WORD_COST.
+	score, context = WORD_COST, (0, 0)
+	for symbol in word:
+		letter = ord(symbol) - ord('a')
+		score += fitness3.next_letter_score(context, letter)
+		context = fitness3.next_context(context, letter)
+	return score
+
+def getWordCodes():
+	# Maps the Morse code of every dictionary word (and SHORT_WORDS),
+	# written without letter separators, to its WORDS_PER_CODE most likely
+	# words, as a list of (wordScore(), word) tuples, best first. Built on
+	# first use only.
+	global wordCodes
+	if wordCodes == None:
+		wordCodes = {}
+		for word in list(detectEnglish.getEnglishWords()) + SHORT_WORDS:
+			word = word.lower()
+			if word.isalpha() and word.isascii():
+				wordCodes.setdefault(''.join([MORSE_CODE[letter] for letter in word]), []).append((wordScore(word), word))
+		for code in wordCodes:
+			wordCodes[code] = heapq.nlargest(WORDS_PER_CODE, wordCodes[code])
+	return wordCodes
+
+def segmentMorse(cipher, top=5, beamWidth=BEAM_WIDTH):
+	# Decodes Morse code without letter separators, e.g. '.-.-..', where
+	# every way of splitting the dots and dashes into letters is a
+	# possible decoding, by splitting it into dictionary words instead.
+	# Dynamic programming from left to right: the beamWidth best decodings
+	# that end at each position are extended by every word whose code,
+	# looked up in getWordCodes(), starts there, and by every single letter
+	# (at LETTER_COST, for names and other words the dictionary lacks). A
+	# position is looked up at most once per code length, so the work
+	# grows linearly with the length of the cipher. '/' separates words.
+	# Returns the top best decodings as a list of (score, plaintext)
+	# tuples, best first.
+	wordCodes = getWordCodes()
+	maxCodeLength = max(map(len, wordCodes))
+	symbols = ''.join([symbol for symbol in cipher if symbol in '.-' + WORD_SEPARATOR])
+	# beams[i] is a list of (score, decoded) for the decodings of
+	# symbols[:i], where decoded is a (word, decoded before it) linked
+	# list, so that extending a decoding does not copy it
+	beams = [[] for i in range(len(symbols) + 1)]
+	beams[0].append((0.0, None))
+	for start in range(len(symbols)):
+		if len(beams[start]) > beamWidth:
+			beams[start] = heapq.nlargest(beamWidth, beams[start], key=getScore)
+		if symbols[start] == WORD_SEPARATOR:
+			beams[start + 1].extend(beams[start])
+			continue
+		for end in range(start + 1, min(start + maxCodeLength, len(symbols)) + 1):
+			code = symbols[start:end]
+			if WORD_SEPARATOR in code:
+				break
+			words = wordCodes.get(code, [])
+			if code in MORSE_TABLE and MORSE_TABLE[code].isalpha() and MORSE_TABLE[code] not in SHORT_WORDS:
+				words = words + [(LETTER_COST, MORSE_TABLE[code])]
+			for wordScore, word in words:
+				for score, decoded in beams[start]:
+					beams[end].append((score + wordScore, (word, decoded)))
+
+	results = []
+	for score, decoded in heapq.nlargest(top, beams[-1], key=getScore):
+		words = []
+		while decoded != None:
+			word, decoded = decoded
+			words.append(word)
+		results.append((score, ' '.join(reversed(words))))
+	return results
+
+def getScore(candidate):
+	return candidate[0]
+
+def breakMorse(cipher, top=5):
+	# display the most likely decodings of Morse code without letter
+	# separators, along with their score
+	for score, plaintext in segmentMorse(cipher, top):
+		print('%.2f %s' % (score, plaintext))
+
 if __name__ == '__main__':
 	cipher = '- . --. .- .-.. / .-.. .- -.- .- / .-.. .- -.- .- / '
-	print(decryptMorse(cipher))
\ No newline at end of file
+	print(decryptMorse(cipher))
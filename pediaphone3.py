@@ -1,15 +1,102 @@
+import heapq, itertools
+
+import fitness3, stream3
+
+PEDIAPHONE = {'2': 'a', '22': 'b', '222': 'c', '3': 'd', '33': 'e', '333': 'f', '4': 'g', '44': 'h', '444': 'i', '5': 'j', '55': 'k', '555': 'l', '6': 'm', '66': 'n', '666': 'o', '7': 'p', '77': 'q', '777': 'r', '7777': 's', '8': 't', '88': 'u', '888': 'v', '9': 'w', '99': 'x', '999': 'y', '9999': 'z', '0000': '0', '11111': '1', '2222': '2', '3333': '3', '4444': '4', '5555': '5', '6666': '6', '77777': '7', '8888': '8', '99999': '9', '0': ' ', '00': '.', '000': '?', '1': '!', '11': ':', '111': ';', '1111': '#'}
+# the tap counts that are a symbol, for every key
+TAP_COUNTS = {}
+for taps in PEDIAPHONE:
+	TAP_COUNTS.setdefault(taps[0], []).append(len(taps))
+
+BEAM_WIDTH = 50  # partial parses kept per position by splitPediaphone()
+SPACE_SCORE = -1.0  # score of a space in splitPediaphone()
+SYMBOL_SCORE = -3.0  # score of a digit or punctuation mark
+
+def decryptPediaphoneStream(chunks):
+	# Decodes an iterable of text chunks of space separated tap groups,
+	# yielding the plaintext piece by piece. Unknown groups decode to '?'.
+	# A group split between two chunks is carried over to the next one.
+	pending = ''
+	for chunk in chunks:
+		tokens = (pending + chunk).split()
+		pending = ''
+		if tokens != [] and not chunk[-1].isspace():
+			pending = tokens.pop()
+		yield ''.join([PEDIAPHONE.get(token, '?') for token in tokens])
+	if pending != '':
+		yield PEDIAPHONE.get(pending, '?')
+
 def decryptPediaphone(cipher):
-	pediaphon = ['2','22','222','3','33','333','4','44','444','5','55','555','6','66','666','7','77','777','7777','8','88','888','9','99','999','9999','0000','11111','2222','3333','4444','5555','6666','77777','8888','99999','0','00','000','1','11','111','1111']
-	alphabet = ['a','b','c','d','e','f','g','h','i','j','k','l','m','n','o','p','q','r','s','t','u','v','w','x','y','z','0','1','2','3','4','5','6','7','8','9',' ','.','?','!',':',';','#']
-	
-	myList = cipher.split()
-	myArr = []
-	for i in range(0, len(myList), 1):
-		for j in range(0, len(pediaphon), 1):
-			if myList[i] == pediaphon[j]:
-				myArr.append(alphabet[j])
-	return ''.join(myArr)
+	return ''.join(decryptPediaphoneStream([cipher]))
+
+def breakPediaphoneStream(cipher, output=None):
+	# Decodes one large file chunk by chunk and writes it to the output
+	# path (or the screen) as it goes.
+	stream3.write_chunks(decryptPediaphoneStream(stream3.read_chunks(cipher)), output)
+	if output == None:
+		print()  # end the last line on the screen
+
+def splitPediaphone(cipher, top=5, beamWidth=BEAM_WIDTH):
+	# Decodes taps without separators between the letters, e.g. '44433',
+	# where a run of one key can be split into groups in several ways
+	# ('444' is i, gh, hg or ggg). Whitespace in cipher still separates
+	# groups. Dynamic programming from left to right: the parses that end
+	# at each position are extended by every group length that is a
+	# symbol of that key and fits in the run, and scored by the
+	# probability of each letter given the previous three in the word
+	# (see fitness3.next_letter_score()). Only the beamWidth best parses
+	# are kept per position, so the work grows linearly with the length of
+	# the cipher. Characters that are not keys decode to '?'. Returns the
+	# top best parses as a list of (score, plaintext) tuples, best first.
+	keys, runEnds = [], []
+	for token in cipher.split():
+		for key, run in itertools.groupby(token):
+			start = len(keys)
+			keys.extend(run)
+			runEnds.extend([len(keys)] * (len(keys) - start))
+
+	# beams[i] is a list of (score, context, parse) for the parses of
+	# keys[:i], where context is the one of fitness3.next_context() and
+	# parse is a (symbol, parse of the taps before it) linked list, so
+	# that extending a parse does not copy it
+	beams = [[] for i in range(len(keys) + 1)]
+	beams[0].append((0.0, (0, 0), None))
+	for start in range(len(keys)):
+		if len(beams[start]) > beamWidth:
+			beams[start] = heapq.nlargest(beamWidth, beams[start], key=getScore)
+		# a character that is not a key decodes to '?' on its own
+		for length in TAP_COUNTS.get(keys[start], [1]):
+			end = start + length
+			if end > runEnds[start]:
+				continue
+			symbol = PEDIAPHONE.get(keys[start] * length, '?')
+			for score, context, parse in beams[start]:
+				if symbol.isalpha():
+					letter = ord(symbol) - ord('a')
+					beams[end].append((score + fitness3.next_letter_score(context, letter), fitness3.next_context(context, letter), (symbol, parse)))
+				elif symbol == ' ':
+					beams[end].append((score + SPACE_SCORE, (0, 0), (symbol, parse)))
+				else:
+					beams[end].append((score + SYMBOL_SCORE, (0, 0), (symbol, parse)))
+
+	results = []
+	for score, context, parse in heapq.nlargest(top, beams[-1], key=getScore):
+		symbols = []
+		while parse != None:
+			symbol, parse = parse
+			symbols.append(symbol)
+		results.append((score, ''.join(reversed(symbols))))
+	return results
+
+def getScore(candidate):
+	return candidate[0]
+
+def breakPediaphone(cipher, top=5):
+	# display the most likely parses of taps without separators, along
+	# with their score
+	for score, plaintext in splitPediaphone(cipher, top):
+		print('%.2f %s' % (score, plaintext))
 
 if __name__ == '__main__':
 	cipher = '3 444 0 22 2 555 444 55 0 8 444 777 2 444 0 6 33 777 2 44'
-	print(decryptPediaphone(cipher))
\ No newline at end of file
+	print(decryptPediaphone(cipher))
@@ -0,0 +1,63 @@
+import detectEnglish
+
+PREFIX_LENGTH = 60  # stage one only looks at this many plaintext characters
+
+class Prefilter:
+	# Two-stage candidate filter shared by the brute-force breakers.
+	#
+	# Stage one (screen) looks at a short decrypted prefix of a candidate
+	# and drops it only when the whole decryption is certain to fail the
+	# letter test of isEnglish(): the prefix alone already holds more
+	# symbols that are not letters or spaces than the whole message may
+	# have. The prefix says nothing certain about the words of the rest of
+	# the message, so they are left to stage two. Stage two (verify) runs
+	# the full isEnglish() check on the complete decryption of the
+	# survivors.
+	def __init__(self, prefix_length=PREFIX_LENGTH, letter_percentage=85):
+		self.prefix_length = prefix_length
+		self.letter_percentage = letter_percentage
+		self.candidates = 0
+		self.rejected_prefix = 0
+		self.rejected_full = 0
+		self.passed = 0
+
+	def screen(self, prefix, length):
+		# Stage one, returns False when the candidate can be dropped.
+		# length is the length of the whole decryption.
+		self.candidates += 1
+		nonletters = len(prefix) - len(detectEnglish.removeNonLetters(prefix))
+		if nonletters * 100 > (100 - self.letter_percentage) * length:
+			self.rejected_prefix += 1
+			return False
+		return True
+
+	def verify(self, plaintext):
+		# Stage two, the full isEnglish() check.
+		if detectEnglish.isEnglish(plaintext, letterPercentage=self.letter_percentage):
+			self.passed += 1
+			return True
+		self.rejected_full += 1
+		return False
+
+	def run(self, keys, decrypt_prefix, decrypt, length):
+		# Yields (key, plaintext) for every key that passes both stages.
+		# decrypt_prefix(key, length) only has to return the first length
+		# characters of the decryption, decrypt(key) the complete one,
+		# which is length characters long.
+		for key in keys:
+			if not self.screen(decrypt_prefix(key, self.prefix_length), length):
+				continue
+			plaintext = decrypt(key)
+			if self.verify(plaintext):
+				yield key, plaintext
+
+	def counters(self):
+		return {'candidates': self.candidates, 'rejected_prefix': self.rejected_prefix, 'rejected_full': self.rejected_full, 'passed': self.passed}
+
+	def merge(self, counters):
+		# Adds the counters of another Prefilter, e.g. one run in a worker
+		# process.
+		self.candidates += counters['candidates']
+		self.rejected_prefix += counters['rejected_prefix']
+		self.rejected_full += counters['rejected_full']
+		self.passed += counters['passed']
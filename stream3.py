@@ -0,0 +1,41 @@
+import sys
+
+CHUNK_SIZE = 1 << 20  # characters read at a time by read_chunks()
+
+def read_chunks(filename, chunk_size=CHUNK_SIZE, mode='r'):
+	# Yields the file in pieces of at most chunk_size characters (bytes
+	# with mode='rb'), so that large inputs are never held in memory at
+	# once. The filename '-' reads standard input.
+	if filename == '-':
+		input_file = sys.stdin.buffer if 'b' in mode else sys.stdin
+	else:
+		input_file = open(filename, mode)
+	while True:
+		chunk = input_file.read(chunk_size)
+		if len(chunk) == 0:
+			break
+		yield chunk
+	if filename != '-':
+		input_file.close()
+
+def open_output(output=None, mode='w'):
+	# Returns the file to write streamed results to: the output path, or
+	# standard output when there is none.
+	if output == None:
+		return sys.stdout
+	return open(output, mode)
+
+def close_output(output_file):
+	if output_file != sys.stdout:
+		output_file.close()
+
+def write_chunks(chunks, output=None, mode='w'):
+	# Writes an iterable of chunks, e.g. a decoder fed by read_chunks(),
+	# to the output path (or the screen) as they come. The output file is
+	# closed even when the chunks raise an error.
+	output_file = open_output(output, mode)
+	try:
+		for chunk in chunks:
+			output_file.write(chunk)
+	finally:
+		close_output(output_file)
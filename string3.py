@@ -5,16 +5,38 @@ class String3:
 		pass
 
 	def digits(self, filename):
-		print(gather_digit(filename))
+		gather_to_stdout(filename, 'digit')
 
 	def lowers(self, filename):
-		print(gather_lower(filename))
+		gather_to_stdout(filename, 'lower')
 
 	def uppers(self, filename):
-		print(gather_upper(filename))
+		gather_to_stdout(filename, 'upper')
 
 	def upperdigits(self, filename):
-		print(gather_upper_digit(filename))
+		gather_to_stdout(filename, 'upperdigit')
 
 	def lowerdigits(self, filename):
-		print(gather_lower_digit(filename))
\ No newline at end of file
+		gather_to_stdout(filename, 'lowerdigit')
+
+	def gathers(self, filename, classes):
+		# classes is a comma separated list of class names (see CLASSES)
+		# or custom sets of characters. One class is shown on the screen,
+		# several are gathered in one pass into filename.<class> files.
+		classes = classes.split(',')
+		try:
+			if len(classes) == 1:
+				gather_to_stdout(filename, classes[0])
+				return
+			outputs = []
+			for i in range(len(classes)):
+				if classes[i] in CLASSES:
+					outputs.append((classes[i], '%s.%s' % (filename, classes[i])))
+				else:
+					outputs.append((classes[i], '%s.custom%s' % (filename, i + 1)))
+			gather_to_files(filename, outputs)
+		except ValueError as error:
+			print(error)
+			return
+		for character_class, path in outputs:
+			print('%s: %s' % (character_class, path))
@@ -5,6 +5,10 @@ from transpositionDecrypt import *
 from detectEnglish import *
 
 import sys
+import prefilter3, fitness3
+
+NUM_TOP_KEYS = 5  # rankTransposition() decrypts and returns this many keys
+
 def breakTranspose(cipher):
     yp_file = open(cipher)
     i = 0
@@ -16,21 +20,102 @@ def breakTranspose(cipher):
         i += 1
     yp_file.close()
 
-def hackTransposition(message):
-    # brute-force by looping through every possible key
-    for key in range(1, len(message)):
-        #print('X')
-        decryptedText = decryptMessage(key, message)
-        if isEnglish(decryptedText):
-            # Check with user to see if the decrypted key has been found.
-            print('\nKey:', key)
-            print('\nPlaintext: ')
-            response = 'Q'
-
-            if response.strip().upper().startswith('Q'):
-                print(decryptedText)
-                break
-    return None
+def decryptTransposition(key, message):
+    # Same result as transpositionDecrypt.decryptMessage(), but the gather
+    # permutation is applied directly: column col of the grid is the run
+    # of ceil((len(message) - col) / key) ciphertext characters that start
+    # where the previous column ended, and it lands on every key-th
+    # plaintext position from col. Each column is copied with one slice
+    # assignment instead of one string concatenation per character.
+    if message.isascii():
+        data = message.encode('ascii')
+        plaintext = bytearray(len(data))
+    else:
+        data = message
+        plaintext = [''] * len(data)
+
+    start = 0
+    for col in range(min(key, len(data))):
+        length = (len(data) - col + key - 1) // key
+        plaintext[col::key] = data[start:start + length]
+        start += length
+
+    if message.isascii():
+        return plaintext.decode('ascii')
+    return ''.join(plaintext)
+
+def decryptTranspositionPrefix(key, message, length):
+    # Returns only the first length characters of
+    # decryptTransposition(key, message). Plaintext position i sits in
+    # column i % key, row i // key, and the first len(message) % key
+    # columns are one character longer than the others.
+    numOfRows, numOfLongColumns = divmod(len(message), key)
+    prefix = []
+    for i in range(min(length, len(message))):
+        col = i % key
+        prefix.append(message[col * numOfRows + min(col, numOfLongColumns) + i // key])
+    return ''.join(prefix)
+
+def scoreTranspositionKeys(message, keys, prefilter=None, fitness=False):
+    # Scores a batch of keys through the two-stage prefilter: keys whose
+    # decrypted prefix already rules out isEnglish() are dropped before
+    # the full decryption.
+    # Returns a list of (key, score) for the keys that pass isEnglish(),
+    # where score is the fraction of English words (or the quadgram
+    # fitness with fitness=True, see fitness3), and the prefilter
+    # counters. This is the unit of work handed to each process by
+    # rankTransposition().
+    if prefilter == None:
+        prefilter = prefilter3.Prefilter()
+    scores = []
+    decryptPrefix = lambda key, length: decryptTranspositionPrefix(key, message, length)
+    decrypt = lambda key: decryptTransposition(key, message)
+    for key, decryptedText in prefilter.run(keys, decryptPrefix, decrypt, len(message)):
+        if fitness:
+            scores.append((key, fitness3.fitness(decryptedText)))
+        else:
+            scores.append((key, getEnglishCount(decryptedText)))
+    return scores, prefilter.counters()
+
+def rankTransposition(message, top=NUM_TOP_KEYS, workers=1, prefilter=None, fitness=False):
+    # Scores every key from 1 to len(message) - 1 and returns the top
+    # best plausible keys as a list of (key, score, plaintext), best
+    # (highest score) first. With workers > 1 the key range is split into
+    # interleaved chunks that are scored in a process pool. Pass a
+    # prefilter3.Prefilter to read how many keys each stage eliminated.
+    # With fitness=True the keys are ranked by quadgram fitness.
+    if prefilter == None:
+        prefilter = prefilter3.Prefilter()
+    keys = range(1, len(message))
+    if workers > 1 and len(keys) > workers:
+        import concurrent.futures  # slow to import, see vigenere3.hackVigenereParallel()
+        scores = []
+        with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+            futures = [executor.submit(scoreTranspositionKeys, message, keys[i::workers], None, fitness) for i in range(workers)]
+            for future in futures:
+                chunkScores, counters = future.result()
+                scores.extend(chunkScores)
+                prefilter.merge(counters)
+    else:
+        scores, counters = scoreTranspositionKeys(message, keys, prefilter, fitness)
+
+    scores.sort(key=lambda keyScore: keyScore[1], reverse=True)
+    results = []
+    for key, score in scores[:top]:
+        results.append((key, score, decryptTransposition(key, message)))
+    return results
+
+def hackTransposition(message, workers=1):
+    # rank every possible key, the best one is already known to be English
+    results = rankTransposition(message, top=1, workers=workers)
+    if results == []:
+        return None
+
+    key, score, decryptedText = results[0]
+    print('\nKey:', key)
+    print('\nPlaintext: ')
+    print(decryptedText)
+    return decryptedText
 
 if __name__ == '__main__':
     cipher2 = """Cb b rssti aieih rooaopbrtnsceee er es no npfgcwu  plri ch nitaalr eiuengiteehb(e1  hilincegeoamn fubehgtarndcstudmd nM eu eacBoltaeteeoinebcdkyremdteghn.aa2r81a condari fmps" tad   l t oisn sit u1rnd stara nvhn fsedbh ee,n  e necrg6  8nmisv l nc muiftegiitm tutmg cm shSs9fcie ebintcaets h  aihda cctrhe ele 1O7 aaoem waoaatdahretnhechaopnooeapece9etfncdbgsoeb uuteitgna.rteoh add e,D7c1Etnpneehtn beete" evecoal lsfmcrl iu1cifgo ai. sl1rchdnheev sh meBd ies e9t)nh,htcnoecplrrh ,ide hmtlme. pheaLem,toeinfgn t e9yce da' eN eMp a ffn Fc1o ge eohg dere.eec s nfap yox hla yon. lnrnsreaBoa t,e eitsw il ulpbdofgBRe bwlmprraio po  droB wtinue r Pieno nc ayieeto'lulcih sfnc  ownaSserbereiaSm-eaiah, nnrttgcC  maciiritvledastinideI  nn rms iehn tsigaBmuoetcetias rn"""
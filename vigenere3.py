@@ -1,13 +1,24 @@
 # Vigenere Cipher Hacker
 # http://inventwithpython.com/hacking (BSD Licensed)
 
-import itertools, re, sys
-import vigenereCipher, freqAnalysis, detectEnglish
+import itertools, re, sys, collections, heapq
+import vigenereCipher, freqAnalysis, detectEnglish, keylength3, friedman3, caesar3, fitness3, stream3
 
 LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
 SILENT_MODE = False  # if set to True, program doesn't print attempts
 NUM_MOST_FREQ_LETTERS = 4 # attempts this many letters per subkey # default 4
 MAX_KEY_LENGTH = 16  # will not attempt keys longer than this # Default 16
+MAX_KEY_CANDIDATES = 5000  # searchKeys() decrypts at most this many keys
+CONFIDENCE_THRESHOLD = 0.5  # searchKeys() stops at a key with this many English words
+NUM_TOP_KEYS = 3  # searchKeys() returns this many keys
+STOP_CHECK_INTERVAL = 64  # searchKeys() polls its stopEvent every this many keys
+NUM_DICTIONARY_HITS = 20  # hackVigenereDictionary() fully checks this many words
+NUM_CRIB_KEYS = 20  # cribDrag() decrypts and ranks this many keys
+UNKNOWN_SUBKEY = '?'  # a letter of a partial key that the crib did not reveal
+SAMPLE_SIZE = 20000  # breakVigenereStream() keeps this many characters for Kasiski
+LETTER_RUNS_PATTERN = re.compile('([^A-Za-z]+)')
+# decrypts the letters under an UNKNOWN_SUBKEY to UNKNOWN_SUBKEY
+UNKNOWN_TABLE = str.maketrans(LETTERS + LETTERS.lower(), UNKNOWN_SUBKEY * (2 * len(LETTERS)))
 NONLETTERS_PATTERN = re.compile('[^A-Z]')
 
 
@@ -30,6 +41,113 @@ def breakVigenere(cipher):
         print('Failed :(')
 
 
+def breakVigenereStream(cipher, output=None):
+    # Breaks one large ciphertext file as a single message, in two passes
+    # that each hold one chunk of the file at a time. The first pass
+    # builds column histograms for every key length and keeps a bounded
+    # sample for Kasiski Examination and to check candidate keys. The
+    # second pass decrypts the file chunk by chunk and writes it to the
+    # output path (or the screen) as it goes.
+    key = hackVigenereStream(cipher)
+    if key == None:
+        print('Failed :(')
+        return None
+
+    print('\nKey: %s\n' % (key))
+    stream3.write_chunks(decryptVigenereStream(key, stream3.read_chunks(cipher)), output)
+    if output == None:
+        print()  # end the last line on the screen
+    return key
+
+
+def hackVigenereStream(cipher, maxKeyLength=None):
+    # Returns the most likely key of the ciphertext file cipher, or None.
+    # columnCounts[keyLength - 1][nth] counts the letters of the nth column
+    # for that key length over the whole file, so memory does not grow
+    # with the file size.
+    if maxKeyLength == None:
+        maxKeyLength = MAX_KEY_LENGTH
+    # Only the key lengths with no multiple up to maxKeyLength are counted
+    # from the text. A column of a shorter length is the sum of the columns
+    # nth, nth + keyLength, ... of its largest multiple.
+    countedLengths = range(maxKeyLength // 2 + 1, maxKeyLength + 1)
+    columnCounts = [[collections.Counter() for nth in range(keyLength)] for keyLength in range(1, maxKeyLength + 1)]
+    sample = []
+    sampleSize = 0
+    numLetters = 0
+    for chunk in stream3.read_chunks(cipher):
+        if sampleSize < SAMPLE_SIZE:
+            sample.append(chunk[:SAMPLE_SIZE - sampleSize])
+            sampleSize += len(sample[-1])
+        letters = NONLETTERS_PATTERN.sub('', chunk.upper())
+        for keyLength in countedLengths:
+            for nth in range(keyLength):
+                # the first letter of this chunk is letter numLetters of
+                # the file, so column nth starts (nth - numLetters) % keyLength
+                # letters into the chunk
+                columnCounts[keyLength - 1][nth].update(letters[(nth - numLetters) % keyLength::keyLength])
+        numLetters += len(letters)
+    sample = ''.join(sample)
+    for keyLength in range(1, maxKeyLength // 2 + 1):
+        multiple = keyLength * (maxKeyLength // keyLength)
+        for nth in range(keyLength):
+            for column in range(nth, multiple, keyLength):
+                columnCounts[keyLength - 1][nth].update(columnCounts[multiple - 1][column])
+
+    profile = []
+    for counts in columnCounts:
+        columnICs = [friedman3.index_of_coincidence(list(columnCount.values())) for columnCount in counts]
+        profile.append(sum(columnICs) / len(columnICs))
+    likelyKeyLengths = keylength3.combineKeyLengthEstimates(profile, kasiskiFactorCounts(sample, maxKeyLength), numLetters)
+
+    for keyLength, confidence in likelyKeyLengths:
+        # Rank the subkeys from the histograms of the whole file, and check
+        # the candidate keys against the sample only.
+        allFreqScores = []
+        for columnCount in columnCounts[keyLength - 1]:
+            shiftScores = freqAnalysis.chiSquaredShifts([columnCount[letter] for letter in LETTERS])
+            columnScores = [(LETTERS[shift], shiftScores[shift]) for shift in range(len(LETTERS))]
+            columnScores.sort(key=getItemAtIndexOne)
+            allFreqScores.append(columnScores[:NUM_MOST_FREQ_LETTERS])
+        results = searchKeys(sample, allFreqScores, silent=True)
+        if results != []:
+            return results[0][0]
+    return None
+
+
+def decryptVigenereStream(key, chunks):
+    # Generator that decrypts an iterable of text chunks with key and
+    # yields the decrypted chunks, keeping the position in the key across
+    # chunks. Within a chunk the letters are decrypted column by column
+    # with caesar3's translate tables, then put back between the symbols.
+    # The letters under an UNKNOWN_SUBKEY of a partial key become
+    # UNKNOWN_SUBKEY.
+    key = key.upper()
+    tables = []
+    for subkey in key:
+        if subkey in LETTERS:
+            tables.append(caesar3.CAESAR_TABLES[LETTERS.find(subkey)])
+        else:
+            tables.append(UNKNOWN_TABLE)
+    keyIndex = 0
+    for chunk in chunks:
+        # parts alternates runs of letters and runs of other symbols
+        parts = LETTER_RUNS_PATTERN.split(chunk)
+        letters = ''.join(parts[0::2])
+        decrypted = [''] * len(letters)
+        for nth in range(min(len(key), len(letters))):
+            decrypted[nth::len(key)] = letters[nth::len(key)].translate(tables[(keyIndex + nth) % len(key)])
+        decrypted = ''.join(decrypted)
+
+        start = 0
+        for i in range(0, len(parts), 2):
+            end = start + len(parts[i])
+            parts[i] = decrypted[start:end]
+            start = end
+        keyIndex = (keyIndex + len(letters)) % len(key)
+        yield ''.join(parts)
+
+
 def findRepeatSequencesSpacings(message):
     # Goes through the message and finds any 3 to 5 letter sequences
     # that are repeated. Returns a dict with the keys of the sequence and
@@ -41,27 +159,43 @@ def findRepeatSequencesSpacings(message):
     # Compile a list of seqLen-letter sequences found in the message.
     seqSpacings = {}  # keys are sequences, values are list of int spacings
     for seqLen in range(3, 6):
+        # Index every seqLen-letter sequence by the list of its start
+        # positions, in one pass over the message.
+        seqPositions = {}
         for seqStart in range(len(message) - seqLen):
-            # Determine what the sequence is, and store it in seq
             seq = message[seqStart:seqStart + seqLen]
-
-            # Look for this sequence in the rest of the message
-            for i in range(seqStart + seqLen, len(message) - seqLen):
-                if message[i:i + seqLen] == seq:
-                    # Found a repeated sequence.
-                    if seq not in seqSpacings:
-                        seqSpacings[seq] = []  # initialize blank list
-
-                    # Append the spacing distance between the repeated
-                    # sequence and the original sequence.
-                    seqSpacings[seq].append(i - seqStart)
+            if seq not in seqPositions:
+                seqPositions[seq] = [seqStart]
+            else:
+                seqPositions[seq].append(seqStart)
+
+        # Only sequences seen more than once have spacings. A repeat must
+        # not overlap the sequence it repeats.
+        repeated = []
+        for seq in seqPositions:
+            positions = seqPositions[seq]
+            if len(positions) < 2:
+                continue
+            spacings = [laterStart - positions[i] for i in range(len(positions)) for laterStart in positions[i + 1:] if laterStart - positions[i] >= seqLen]
+            if spacings != []:
+                # the first start that has a non-overlapping repeat
+                firstStart = min([start for start in positions if positions[-1] - start >= seqLen])
+                repeated.append((firstStart, seq, spacings))
+
+        # Keep the sequences in the order their first repeat was found.
+        repeated.sort()
+        for firstStart, seq, spacings in repeated:
+            seqSpacings[seq] = spacings
     return seqSpacings
 
 
-def getUsefulFactors(num):
+def getUsefulFactors(num, maxKeyLength=None):
     # Returns a list of useful factors of num. By "useful" we mean factors
-    # less than MAX_KEY_LENGTH + 1. For example, getUsefulFactors(144)
-    # returns [2, 72, 3, 48, 4, 36, 6, 24, 8, 18, 9, 16, 12]
+    # less than maxKeyLength + 1 (by default MAX_KEY_LENGTH + 1). For
+    # example, getUsefulFactors(144) returns
+    # [2, 72, 3, 48, 4, 36, 6, 24, 8, 18, 9, 16, 12]
+    if maxKeyLength == None:
+        maxKeyLength = MAX_KEY_LENGTH
 
     if num < 2:
         return []  # numbers less than 2 have no useful factors
@@ -69,8 +203,8 @@ def getUsefulFactors(num):
     factors = []  # the list of factors found
 
     # When finding factors, you only need to check the integers up to
-    # MAX_KEY_LENGTH.
-    for i in range(2, MAX_KEY_LENGTH + 1):  # don't test 1
+    # maxKeyLength.
+    for i in range(2, maxKeyLength + 1):  # don't test 1
         if num % i == 0:
             factors.append(i)
             factors.append(int(num / i))
@@ -83,51 +217,47 @@ def getItemAtIndexOne(x):
     return x[1]
 
 
-def getMostCommonFactors(seqFactors):
-    # First, get a count of how many times a factor occurs in seqFactors.
-    factorCounts = {}  # key is a factor, value is how often if occurs
-
-    # seqFactors keys are sequences, values are lists of factors of the
-    # spacings. seqFactors has a value like: {'GFD': [2, 3, 4, 6, 9, 12,
-    # 18, 23, 36, 46, 69, 92, 138, 207], 'ALW': [2, 3, 4, 6, ...], ...}
-    for seq in seqFactors:
-        factorList = seqFactors[seq]
-        for factor in factorList:
-            if factor not in factorCounts:
-                factorCounts[factor] = 0
-            factorCounts[factor] += 1
-
-    # Second, put the factor and its count into a tuple, and make a list
-    # of these tuples so we can sort them.
-    factorsByCount = []
-    for factor in factorCounts:
-        # exclude factors larger than MAX_KEY_LENGTH
-        if factor <= MAX_KEY_LENGTH:
-            # factorsByCount is a list of tuples: (factor, factorCount)
-            # factorsByCount has a value like: [(3, 497), (2, 487), ...]
-            factorsByCount.append((factor, factorCounts[factor]))
-
-    # Sort the list by the factor count.
-    factorsByCount.sort(key=getItemAtIndexOne, reverse=True)
-
-    return factorsByCount
-
+def kasiskiFactorCounts(ciphertext, maxKeyLength=None):
+    # Returns the factorsByCount list behind kasiskiExamination(), a list
+    # of (factor, factorCount) tuples sorted by count, most common first.
+    # Only factors up to maxKeyLength (by default MAX_KEY_LENGTH) count.
+    if maxKeyLength == None:
+        maxKeyLength = MAX_KEY_LENGTH
 
-def kasiskiExamination(ciphertext):
     # Find out the sequences of 3 to 5 letters that occur multiple times
     # in the ciphertext. repeatedSeqSpacings has a value like:
     # {'EXG': [192], 'NAF': [339, 972, 633], ... }
     repeatedSeqSpacings = findRepeatSequencesSpacings(ciphertext)
 
-    # See getMostCommonFactors() for a description of seqFactors.
-    seqFactors = {}
-    for seq in repeatedSeqSpacings:
-        seqFactors[seq] = []
-        for spacing in repeatedSeqSpacings[seq]:
-            seqFactors[seq].extend(getUsefulFactors(spacing))
+    # Count how often each useful factor divides a spacing, in a single
+    # accumulation array indexed by the factor. Factors are computed once
+    # per distinct spacing, weighted by how often that spacing occurs.
+    allSpacings = list(itertools.chain.from_iterable(repeatedSeqSpacings.values()))
+    factorCounts = [0] * (maxKeyLength + 1)
+    for spacing, count in collections.Counter(allSpacings).items():
+        for factor in getUsefulFactors(spacing, maxKeyLength):
+            if factor <= maxKeyLength:
+                factorCounts[factor] += count
+
+    # Ties in the ranking are broken by the order the factors are first
+    # seen in, so walk the spacings until every counted factor was seen.
+    numFactors = len([count for count in factorCounts if count > 0])
+    factorOrder = []
+    for spacing in allSpacings:
+        if len(factorOrder) == numFactors:
+            break
+        for factor in getUsefulFactors(spacing, maxKeyLength):
+            if factor <= maxKeyLength and factor not in factorOrder:
+                factorOrder.append(factor)
+
+    # factorsByCount has a value like: [(3, 497), (2, 487), ...]
+    factorsByCount = [(factor, factorCounts[factor]) for factor in factorOrder]
+    factorsByCount.sort(key=getItemAtIndexOne, reverse=True)
+    return factorsByCount
 
-    # See getMostCommonFactors() for a description of factorsByCount.
-    factorsByCount = getMostCommonFactors(seqFactors)
+
+def kasiskiExamination(ciphertext, maxKeyLength=None):
+    factorsByCount = kasiskiFactorCounts(ciphertext, maxKeyLength)
 
     # Now we extract the factor counts from factorsByCount and
     # put them in allLikelyKeyLengths so that they are easier to
@@ -139,46 +269,41 @@ def kasiskiExamination(ciphertext):
     return allLikelyKeyLengths
 
 
-def getNthSubkeysLetters(n, keyLength, message):
-    # Returns every Nth letter for each keyLength set of letters in text.
-    # E.g. getNthSubkeysLetters(1, 3, 'ABCABCABC') returns 'AAA'
-    #      getNthSubkeysLetters(2, 3, 'ABCABCABC') returns 'BBB'
-    #      getNthSubkeysLetters(3, 3, 'ABCABCABC') returns 'CCC'
-    #      getNthSubkeysLetters(1, 5, 'ABCDEFGHI') returns 'AF'
+def getColumnShiftScores(letters, keyLength):
+    # Returns a list of keyLength lists of 26 chi-squared scores, where
+    # entry [nth][shift] scores subkey LETTERS[shift] for the nth column of
+    # letters (which must be upper case letters only).
+    allShiftScores = []
+    for nth in range(keyLength):
+        letterVector = freqAnalysis.getLetterVector(letters[nth::keyLength])
+        allShiftScores.append(freqAnalysis.chiSquaredShifts(letterVector))
+    return allShiftScores
 
-    # Use a regular expression to remove non-letters from the message.
-    message = NONLETTERS_PATTERN.sub('', message)
 
-    i = n - 1
-    letters = []
-    while i < len(message):
-        letters.append(message[i])
-        i += keyLength
-    return ''.join(letters)
+def scoreKeyColumns(ciphertext, keyLength):
+    # Returns a list of keyLength lists, one per letter of the key. Each
+    # inner list holds (<letter>, <chi-squared score>) tuples for all 26
+    # possible subkeys of that column, best (lowest score) first.
+    # Each column's letters are counted once and every subkey is scored by
+    # rotating that histogram, instead of decrypting the column 26 times.
+    allColumnScores = []
+    for shiftScores in getColumnShiftScores(NONLETTERS_PATTERN.sub('', ciphertext.upper()), keyLength):
+        columnScores = [(LETTERS[shift], shiftScores[shift]) for shift in range(len(LETTERS))]
+        columnScores.sort(key=getItemAtIndexOne)
+        allColumnScores.append(columnScores)
+    return allColumnScores
 
 
 def attemptHackWithKeyLength(ciphertext, mostLikelyKeyLength):
     # Determine the most likely letters for each letter in the key.
     ciphertextUp = ciphertext.upper()
     # allFreqScores is a list of mostLikelyKeyLength number of lists.
-    # These inner lists are the freqScores lists.
+    # These inner lists are the freqScores lists, tuples like
+    # [(<letter>, <chi-squared score>), ... ] sorted by score. Lower
+    # score means a better match with English letter frequency.
     allFreqScores = []
-    for nth in range(1, mostLikelyKeyLength + 1):
-        nthLetters = getNthSubkeysLetters(nth, mostLikelyKeyLength, ciphertextUp)
-
-        # freqScores is a list of tuples like:
-        # [(<letter>, <Eng. Freq. match score>), ... ]
-        # List is sorted by match score. Higher score means better match.
-        # See the englishFreqMatchScore() comments in freqAnalysis.py.
-        freqScores = []
-        for possibleKey in LETTERS:
-            decryptedText = vigenereCipher.decryptMessage(possibleKey, nthLetters)
-            keyAndFreqMatchTuple = (possibleKey, freqAnalysis.englishFreqMatchScore(decryptedText))
-            freqScores.append(keyAndFreqMatchTuple)
-        # Sort by match score
-        freqScores.sort(key=getItemAtIndexOne, reverse=True)
-
-        allFreqScores.append(freqScores[:NUM_MOST_FREQ_LETTERS])
+    for columnScores in scoreKeyColumns(ciphertext, mostLikelyKeyLength):
+        allFreqScores.append(columnScores[:NUM_MOST_FREQ_LETTERS])
 
     if not SILENT_MODE:
         for i in range(len(allFreqScores)):
@@ -188,74 +313,233 @@ def attemptHackWithKeyLength(ciphertext, mostLikelyKeyLength):
                 print('%s ' % freqScore[0], end='')
             print()  # print a newline
 
-    # Try every combination of the most likely letters for each position
-    # in the key.
-    for indexes in itertools.product(range(NUM_MOST_FREQ_LETTERS), repeat=mostLikelyKeyLength):
-        # Create a possible key from the letters in allFreqScores
-        possibleKey = ''
-        for i in range(mostLikelyKeyLength):
-            possibleKey += allFreqScores[i][indexes[i]][0]
+    results = searchKeys(ciphertext, allFreqScores)
+    if results == []:
+        # No English-looking decryption found, so return None.
+        return None
 
-        if not SILENT_MODE:
-            print('Attempting with key: %s' % (possibleKey))
+    possibleKey, confidence, decryptedText = results[0]
+    if not SILENT_MODE:
+        print('Possible encryption hack with key %s:' % (possibleKey))
+        print(decryptedText[:200])  # only show first 200 characters
+        print()
+    return decryptedText
+
+
+def searchKeys(ciphertext, allFreqScores, top=NUM_TOP_KEYS, maxCandidates=MAX_KEY_CANDIDATES, threshold=CONFIDENCE_THRESHOLD, silent=None, stopEvent=None):
+    # Best-first search over the keys made of the letters in allFreqScores
+    # (see scoreKeyColumns()), in order of increasing total chi-squared
+    # score. A priority queue holds the frontier: a key is a tuple of
+    # ranks, one per column, and popping it pushes every key that takes
+    # the next letter in one column. Each popped key is decrypted and
+    # checked with isEnglish(); the search stops at the first key whose
+    # fraction of English words reaches threshold, or after maxCandidates
+    # keys. Returns up to top (key, confidence, plaintext) tuples, where
+    # confidence is the fraction of English words, best first.
+    # silent defaults to SILENT_MODE. When another process sets stopEvent
+    # the search gives up early.
+    if silent == None:
+        silent = SILENT_MODE
+    keyLength = len(allFreqScores)
+    start = tuple([0] * keyLength)
+    frontier = [(sum([freqScores[0][1] for freqScores in allFreqScores]), start)]
+    seen = set([start])
+    results = []
+    candidates = 0
+
+    while frontier != [] and candidates < maxCandidates:
+        if stopEvent != None and candidates % STOP_CHECK_INTERVAL == 0 and stopEvent.is_set():
+            break
+        totalScore, indexes = heapq.heappop(frontier)
+        candidates += 1
+        possibleKey = ''.join([allFreqScores[i][indexes[i]][0] for i in range(keyLength)])
 
-        decryptedText = vigenereCipher.decryptMessage(possibleKey, ciphertextUp)
+        if not silent:
+            print('Attempting with key: %s' % (possibleKey))
 
+        decryptedText = vigenereCipher.decryptMessage(possibleKey, ciphertext)
         if detectEnglish.isEnglish(decryptedText):
-            # Set the hacked ciphertext to the original casing.
-            origCase = []
-            for i in range(len(ciphertext)):
-                if ciphertext[i].isupper():
-                    origCase.append(decryptedText[i].upper())
-                else:
-                    origCase.append(decryptedText[i].lower())
-            decryptedText = ''.join(origCase)
-
-            # Check with user to see if the key has been found.
-            print('Possible encryption hack with key %s:' % (possibleKey))
-            print(decryptedText[:200])  # only show first 200 characters
-            print()
-            print('Enter D for done, or just press Enter to continue hacking:')
-            response = input('> ')
-
-            if response.strip().upper().startswith('D'):
-                return decryptedText
-
-    # No English-looking decryption found, so return None.
-    return None
+            confidence = detectEnglish.getEnglishCount(decryptedText)
+            results.append((possibleKey, confidence, decryptedText))
+            if confidence >= threshold:
+                break
+
+        # Queue the keys that swap one letter for the next most likely one.
+        for i in range(keyLength):
+            if indexes[i] + 1 < len(allFreqScores[i]):
+                nextIndexes = indexes[:i] + (indexes[i] + 1,) + indexes[i + 1:]
+                if nextIndexes not in seen:
+                    seen.add(nextIndexes)
+                    nextScore = totalScore - allFreqScores[i][indexes[i]][1] + allFreqScores[i][indexes[i] + 1][1]
+                    heapq.heappush(frontier, (nextScore, nextIndexes))
+
+    results.sort(key=getItemAtIndexOne, reverse=True)
+    return results[:top]
 
 
 def hackVigenere(ciphertext):
-    # First, we need to do Kasiski Examination to figure out what the
-    # length of the ciphertext's encryption key is.
-    allLikelyKeyLengths = kasiskiExamination(ciphertext)
+    # First, we need to estimate the length of the ciphertext's encryption
+    # key. keylength3 combines Kasiski Examination, the Friedman test and
+    # the index of coincidence of every period into one ranking, and every
+    # possible key length is tried in that order.
+    likelyKeyLengths = keylength3.estimateKeyLengths(ciphertext, kasiskiFactorCounts(ciphertext, MAX_KEY_LENGTH), MAX_KEY_LENGTH)
     if not SILENT_MODE:
         keyLengthStr = ''
-        for keyLength in allLikelyKeyLengths:
-            keyLengthStr += '%s ' % (keyLength)
-        print('\nKasiski Examination: ' + keyLengthStr + '\n')
+        for keyLength, confidence in likelyKeyLengths:
+            keyLengthStr += '%s (%.2f) ' % (keyLength, confidence)
+        print('\nKey length estimate: ' + keyLengthStr + '\n')
 
-    for keyLength in allLikelyKeyLengths:
+    hackedMessage = None
+    for keyLength, confidence in likelyKeyLengths:
         if not SILENT_MODE:
             print('\nAttempting hack with key length %s (%s possible keys)...' % (keyLength, NUM_MOST_FREQ_LETTERS ** keyLength))
         hackedMessage = attemptHackWithKeyLength(ciphertext, keyLength)
         if hackedMessage != None:
             break
+    return hackedMessage
 
-    # If none of the key lengths we found using Kasiski Examination
-    # worked, start brute-forcing through key lengths.
-    if hackedMessage == None:
-        if not SILENT_MODE:
-            print('Unable to hack message with likely key length(s). Brute forcing key length...')
-        for keyLength in range(1, MAX_KEY_LENGTH + 1):
-            # don't re-check key lengths already tried from Kasiski
-            if keyLength not in allLikelyKeyLengths:
-                if not SILENT_MODE:
-                    print('Attempting hack with key length %s (%s possible keys)...' % (keyLength, NUM_MOST_FREQ_LETTERS ** keyLength))
-                hackedMessage = attemptHackWithKeyLength(ciphertext, keyLength)
-                if hackedMessage != None:
+
+def hackVigenereDictionary(ciphertext, top=NUM_DICTIONARY_HITS, fitness=False):
+    # Tries every word of the English dictionary as the key. The words are
+    # grouped by length; for each length the column shift scores are
+    # computed once, so a word is scored by adding one table entry per
+    # letter, without decrypting anything. Only the top best scoring
+    # words are decrypted and checked with isEnglish(). Returns a list of
+    # (key, confidence, plaintext) tuples, where confidence is the
+    # fraction of English words (or the quadgram fitness with
+    # fitness=True, see fitness3), best first.
+    letters = NONLETTERS_PATTERN.sub('', ciphertext.upper())
+    wordsByLength = {}
+    for word in detectEnglish.getEnglishWords():
+        if 0 < len(word) <= len(letters) and word.isalpha() and word.isupper():
+            wordsByLength.setdefault(len(word), []).append(word)
+
+    scoredWords = []  # list of (score, word)
+    for keyLength in wordsByLength:
+        # Index the tables by the ASCII code of the key letter, so that a
+        # word's bytes can be used as indexes directly.
+        tables = [[0.0] * ord('A') + shiftScores for shiftScores in getColumnShiftScores(letters, keyLength)]
+        for word in wordsByLength[keyLength]:
+            scoredWords.append((sum(map(list.__getitem__, tables, word.encode('ascii'))), word))
+
+    results = []
+    for score, word in heapq.nsmallest(top, scoredWords):
+        decryptedText = vigenereCipher.decryptMessage(word, ciphertext)
+        if detectEnglish.isEnglish(decryptedText):
+            results.append((word, detectEnglish.getEnglishCount(decryptedText), decryptedText))
+    if fitness:
+        return fitness3.rank_by_fitness(results)
+    results.sort(key=getItemAtIndexOne, reverse=True)
+    return results
+
+
+def cribDrag(ciphertext, crib, keyLength=None, maxKeyLength=None, top=NUM_CRIB_KEYS):
+    # Slides crib, a known fragment of the plaintext (e.g. a flag prefix
+    # or a protocol header), across the ciphertext and derives the key
+    # stream implied at each offset (see caesar3.deriveKeyStreams()). The
+    # periods are tried in the order of keylength3.estimateKeyLengths(),
+    # Kasiski Examination included, up to maxKeyLength (by default
+    # MAX_KEY_LENGTH), or only keyLength when it is known. At each offset
+    # the key stream is folded into a key of the first period it fits,
+    # letter j of the crib giving key letter (offset + j) % period; a crib
+    # longer than the period must agree with itself, a shorter one leaves
+    # the rest of the key as UNKNOWN_SUBKEY. The candidates are ranked by
+    # the chi-squared score of the columns they reveal (see
+    # getColumnShiftScores()), and the top best are decrypted and ranked
+    # by fitness3.fitness() of the known letters. Returns a list of (key, fitness, offsets) tuples,
+    # where offsets are the letter offsets the crib fits at with that key,
+    # best first.
+    letters = NONLETTERS_PATTERN.sub('', ciphertext.upper())
+    crib = NONLETTERS_PATTERN.sub('', crib.upper())
+    if keyLength != None:
+        periods = [keyLength]
+    else:
+        if maxKeyLength == None:
+            maxKeyLength = MAX_KEY_LENGTH
+        likelyKeyLengths = keylength3.estimateKeyLengths(ciphertext, kasiskiFactorCounts(ciphertext, maxKeyLength), maxKeyLength)
+        periods = [period for period, confidence in likelyKeyLengths]
+    keyStreams = caesar3.deriveKeyStreams(letters, crib)
+
+    keyOffsets = {}
+    keyScores = {}
+    periodShiftScores = {}  # period -> getColumnShiftScores(), on first use
+    for offset, keyStream in enumerate(keyStreams):
+        for period in periods:
+            if keyStream[:-period] != keyStream[period:]:
+                continue
+            if period not in periodShiftScores:
+                periodShiftScores[period] = getColumnShiftScores(letters, period)
+            shiftScores = periodShiftScores[period]
+            key = [UNKNOWN_SUBKEY] * period
+            for j in range(min(period, len(keyStream))):
+                key[(offset + j) % period] = keyStream[j]
+            key = ''.join(key)
+            # a key made of a shorter key repeated is that key
+            for divisor in range(1, period):
+                if period % divisor == 0 and key == key[:divisor] * (period // divisor):
+                    key = key[:divisor]
                     break
-    return hackedMessage
+            if key not in keyScores:
+                known = [nth for nth in range(period) if key[nth % len(key)] != UNKNOWN_SUBKEY]
+                keyScores[key] = sum([shiftScores[nth][LETTERS.find(key[nth % len(key)])] for nth in known]) / len(known)
+            keyOffsets.setdefault(key, []).append(offset)
+            break
+
+    # The known letters of a partial key are at least len(crib) in a row,
+    # so n-grams of up to that many letters are seen in every candidate.
+    n = min(max(len(crib), 2), 4)
+    results = []
+    for key in heapq.nsmallest(top, keyScores, key=keyScores.__getitem__):
+        decryptedText = ''.join(decryptVigenereStream(key, [ciphertext]))
+        results.append((key, fitness3.fitness(decryptedText, n), keyOffsets[key]))
+    results.sort(key=getItemAtIndexOne, reverse=True)
+    return results
+
+
+def searchKeyLengthChunk(ciphertext, keyLength, firstLetterRank, numMostFreqLetters, maxCandidates, threshold, stopEvent):
+    # The unit of work of hackVigenereParallel(): the keys of length
+    # keyLength whose first letter is the firstLetterRank-th most likely
+    # one. All settings are passed in, so no module global is read.
+    allFreqScores = []
+    for columnScores in scoreKeyColumns(ciphertext, keyLength):
+        allFreqScores.append(columnScores[:numMostFreqLetters])
+    allFreqScores[0] = allFreqScores[0][firstLetterRank:firstLetterRank + 1]
+    return searchKeys(ciphertext, allFreqScores, 1, maxCandidates, threshold, True, stopEvent)
+
+
+def hackVigenereParallel(ciphertext, maxKeyLength=16, numMostFreqLetters=4, maxCandidates=MAX_KEY_CANDIDATES, threshold=CONFIDENCE_THRESHOLD, workers=None):
+    # Spreads the key search over a process pool. Every key length, and
+    # within a length every choice of the first key letter, is a separate
+    # task, submitted in the order of keylength3.estimateKeyLengths(). The
+    # settings are arguments instead of the module globals, so runs with
+    # different settings can share a process. As soon as a task finds a
+    # key with confidence of at least threshold, the other tasks are
+    # cancelled. Returns the best (key, confidence, plaintext) found, or
+    # None.
+    # the pool modules take longer to import than the rest of the program,
+    # so only the commands that use them pay for it
+    import concurrent.futures, multiprocessing
+    likelyKeyLengths = keylength3.estimateKeyLengths(ciphertext, kasiskiFactorCounts(ciphertext, maxKeyLength), maxKeyLength)
+    best = None
+    with multiprocessing.Manager() as manager:
+        stopEvent = manager.Event()
+        with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+            futures = []
+            for keyLength, confidence in likelyKeyLengths:
+                for firstLetterRank in range(min(numMostFreqLetters, len(LETTERS))):
+                    futures.append(executor.submit(searchKeyLengthChunk, ciphertext, keyLength, firstLetterRank, numMostFreqLetters, maxCandidates, threshold, stopEvent))
+
+            for future in concurrent.futures.as_completed(futures):
+                if future.cancelled():
+                    continue
+                for result in future.result():
+                    if best == None or result[1] > best[1]:
+                        best = result
+                if best != None and best[1] >= threshold and not stopEvent.is_set():
+                    stopEvent.set()
+                    for pending in futures:
+                        pending.cancel()
+    return best
 
 
 # If vigenereHacker.py is run (instead of imported as a module) call